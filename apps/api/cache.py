@@ -0,0 +1,94 @@
+"""
+Redis-кэш для тяжёлых dashboard endpoints
+
+Кэш — оптимизация, а не зависимость: если Redis недоступен,
+endpoint просто считает ответ напрямую из БД.
+
+Перед Redis стоит короткий кэш в памяти процесса: dashboard опрашивается
+каждые несколько секунд, и повторные заходы не ходят даже в Redis.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+import orjson
+import redis
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+_redis_client: Optional[redis.Redis] = None
+
+# Сколько секунд процесс отдаёт значение из памяти, не спрашивая Redis
+LOCAL_CACHE_TTL = float(os.getenv("LOCAL_CACHE_TTL_SECONDS", "5"))
+LOCAL_CACHE_SIZE = int(os.getenv("LOCAL_CACHE_SIZE", "256"))
+
+# key -> (monotonic-время истечения, значение); эндпоинты синхронные и
+# выполняются в threadpool, поэтому доступ под lock
+_local_cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def get_redis() -> redis.Redis:
+    """Общий клиент (пул соединений) с короткими таймаутами"""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(
+            REDIS_URL,
+            socket_timeout=0.25,
+            socket_connect_timeout=0.25,
+        )
+    return _redis_client
+
+
+def _local_get(key: str) -> Optional[Any]:
+    with _local_lock:
+        entry = _local_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del _local_cache[key]
+            return None
+        return entry[1]
+
+
+def _local_set(key: str, value: Any, ttl_seconds: float) -> None:
+    if ttl_seconds <= 0:
+        return
+    with _local_lock:
+        _local_cache[key] = (time.monotonic() + ttl_seconds, value)
+        _local_cache.move_to_end(key)
+        while len(_local_cache) > LOCAL_CACHE_SIZE:
+            _local_cache.popitem(last=False)
+
+
+def cache_get_json(key: str) -> Optional[Any]:
+    """Прочитать JSON из кэша; None при промахе или недоступном Redis"""
+    value = _local_get(key)
+    if value is not None:
+        return value
+    
+    try:
+        raw = get_redis().get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+        return None
+    if not raw:
+        return None
+    
+    value = orjson.loads(raw)
+    _local_set(key, value, LOCAL_CACHE_TTL)
+    return value
+
+
+def cache_set_json(key: str, value: Any, ttl_seconds: int) -> None:
+    """Положить JSON в кэш с TTL; ошибки Redis только логируются"""
+    _local_set(key, value, min(LOCAL_CACHE_TTL, ttl_seconds))
+    try:
+        get_redis().set(key, orjson.dumps(value), ex=ttl_seconds)
+    except redis.RedisError as e:
+        logger.warning(f"Cache write failed for {key}: {e}")
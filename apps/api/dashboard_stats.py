@@ -0,0 +1,70 @@
+"""
+Payload /analytics/dashboard
+
+Общий для API (live-расчёт, когда снимка нет) и воркера
+(refresh_dashboard_snapshot_task пишет его в dashboard_snapshot).
+"""
+from typing import Dict
+
+from sqlalchemy import select, func
+
+from apps.db.models import Game
+from apps.db.models_investor import (
+    GameInvestmentScore,
+    WishlistSignalDaily,
+    ExternalSignalDaily,
+)
+
+# investor_category, которые dashboard показывает отдельными счётчиками
+DASHBOARD_CATEGORIES = (
+    'undermarketed_gem',
+    'marketing_fixable',
+    'product_risk',
+    'not_investable',
+    'watch',
+)
+
+
+def compute_dashboard_stats(db) -> Dict:
+    """Посчитать payload /analytics/dashboard напрямую из БД"""
+    # Все метрики одним запросом: агрегаты по game_investment_scores +
+    # некоррелированные подзапросы по остальным таблицам (1 round-trip вместо 8)
+    stmt = select(
+        select(func.count(Game.id)).scalar_subquery().label("total_games"),
+        func.count(GameInvestmentScore.id).label("games_scored"),
+        *(
+            func.count(GameInvestmentScore.id)
+            .filter(GameInvestmentScore.investor_category == category)
+            .label(category)
+            for category in DASHBOARD_CATEGORIES
+        ),
+        func.avg(GameInvestmentScore.product_potential).label("avg_pp"),
+        func.avg(GameInvestmentScore.gtm_execution).label("avg_gtm"),
+        func.avg(GameInvestmentScore.gap_score).label("avg_gap"),
+        select(func.count(func.distinct(WishlistSignalDaily.game_id))).scalar_subquery().label("games_with_ewi"),
+        select(func.count(func.distinct(ExternalSignalDaily.game_id))).scalar_subquery().label("games_with_epv"),
+        select(func.avg(WishlistSignalDaily.ewi_score)).scalar_subquery().label("avg_ewi"),
+        select(func.avg(ExternalSignalDaily.epv_score)).scalar_subquery().label("avg_epv"),
+    ).select_from(GameInvestmentScore)
+    
+    row = db.execute(stmt).mappings().one()
+    
+    avg_ewi = row["avg_ewi"]
+    avg_epv = row["avg_epv"]
+    
+    return {
+        "total_games": row["total_games"],
+        "games_scored": row["games_scored"],
+        "undermarketed_gems": row["undermarketed_gem"],
+        "marketing_fixable": row["marketing_fixable"],
+        "product_risk": row["product_risk"],
+        "not_investable": row["not_investable"],
+        "watch": row["watch"],
+        "avg_product_potential": round(float(row["avg_pp"] or 0), 1),
+        "avg_gtm_execution": round(float(row["avg_gtm"] or 0), 1),
+        "avg_gap_score": round(float(row["avg_gap"] or 0), 1),
+        "games_with_ewi": row["games_with_ewi"],
+        "games_with_epv": row["games_with_epv"],
+        "avg_ewi": round(float(avg_ewi), 1) if avg_ewi else None,
+        "avg_epv": round(float(avg_epv), 1) if avg_epv else None,
+    }
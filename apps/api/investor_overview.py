@@ -0,0 +1,64 @@
+"""
+Инвесторский обзор дня (/analytics/investor-overview)
+
+Общий для API (расчёт, если в investor_overview_cache нет строки за сегодня)
+и воркера (save_daily_snapshot_task кладёт обзор в investor_overview_cache).
+"""
+from datetime import date
+from typing import Dict
+
+from sqlalchemy import text
+
+
+def build_investor_overview(db, today: date) -> Dict:
+    """Инвесторский обзор дня: топ-3 тренда и следующие действия"""
+    # ТОП-3 ТРЕНДА ДНЯ
+    trends = db.execute(text("""
+        SELECT 
+            trend_name,
+            source,
+            trend_score,
+            confidence,
+            video_count + post_count as mentions,
+            CASE 
+                WHEN trend_score > 500 THEN 'Растёт'
+                WHEN trend_score > 200 THEN 'Стабильно'
+                ELSE 'Снижается'
+            END as status,
+            CASE
+                WHEN confidence > 0.7 THEN 'Высокая'
+                WHEN confidence > 0.5 THEN 'Средняя'
+                ELSE 'Низкая'
+            END as confidence_level
+        FROM trend_daily_snapshot
+        WHERE date = :today
+        ORDER BY trend_score DESC
+        LIMIT 3
+    """), {'today': today}).fetchall()
+    
+    top_trends = [{
+        'name': t[0],
+        'source': t[1],
+        'score': t[2],
+        'mentions': t[4],
+        'status': t[5],
+        'confidence': t[6]
+    } for t in trends]
+    
+    # СЛЕДУЮЩИЕ ДЕЙСТВИЯ (на основе трендов)
+    actions = []
+    if trends:
+        top_trend = trends[0][0]
+        actions = [
+            f"Просканировать Itch.io по запросу '{top_trend}' за последние 14 дней",
+            f"Отобрать проекты с демо и слабым GTM (GAP > 4)",
+            f"Проверить наличие YouTube-видео у отобранных игр",
+            f"Сформировать shortlist из 5 игр для контакта",
+            f"Отслеживать рост тренда '{top_trend}' следующие 7 дней"
+        ]
+    
+    return {
+        'date': str(today),
+        'top_trends': top_trends,
+        'next_actions': actions
+    }
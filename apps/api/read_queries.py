@@ -0,0 +1,49 @@
+"""
+Параллельные read-запросы для API
+
+Независимые запросы одного endpoint'а выполняются каждый на своей сессии
+в threadpool: время ответа ~ самый медленный запрос, а не сумма.
+"""
+import asyncio
+import os
+from typing import Any, Callable, List
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from apps.db.session import get_db_session
+
+# Потолок для read-запросов dashboard: зависший запрос не держит вкладку вечно
+READ_STATEMENT_TIMEOUT_MS = int(os.getenv("ANALYTICS_STATEMENT_TIMEOUT_MS", "2000"))
+
+# Выполняются в начале каждого read-запроса — собираем один раз при импорте
+READ_ONLY_SQL = text("SET TRANSACTION READ ONLY")
+STATEMENT_TIMEOUT_SQL = text("SELECT set_config('statement_timeout', :timeout, true)")
+STATEMENT_TIMEOUT_PARAMS = {"timeout": f"{READ_STATEMENT_TIMEOUT_MS}ms"}
+
+
+def begin_read_only(db: Session) -> None:
+    """Открыть read-only транзакцию с statement_timeout для всех запросов сессии"""
+    db.execute(READ_ONLY_SQL)
+    db.execute(STATEMENT_TIMEOUT_SQL, STATEMENT_TIMEOUT_PARAMS)
+
+
+async def run_queries_concurrently(*queries: Callable[[Session], Any]) -> List[Any]:
+    """
+    Выполнить независимые read-запросы параллельно.
+    
+    Каждый запрос получает собственную сессию (= соединение из пула) в
+    threadpool, поэтому время ответа ~ самый медленный запрос, а не сумма.
+    """
+    return await asyncio.gather(*(run_in_threadpool(run_read_query, query) for query in queries))
+
+
+def run_read_query(query: Callable[[Session], Any]) -> Any:
+    """Выполнить read-запрос на отдельной сессии и сразу вернуть соединение в пул"""
+    db = get_db_session()
+    try:
+        begin_read_only(db)
+        return query(db)
+    finally:
+        db.close()
@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Query
+from sqlalchemy.orm import joinedload
 from sqlalchemy import select, func, or_
 from typing import Optional
-from datetime import date
+from datetime import date, timedelta
 
-from apps.api.deps import get_db_session
+from apps.api.read_queries import run_queries_concurrently
 from apps.api.schemas.games import GameResponse, GameListResponse
 from apps.db.models import Game, GameSource, GameMetricsDaily
 
@@ -18,8 +18,7 @@ async def list_games(
     from_date: Optional[date] = Query(None, description="Filter from created date"),
     to_date: Optional[date] = Query(None, description="Filter to created date"),
     page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db_session)
+    page_size: int = Query(20, ge=1, le=100)
 ):
     """List games with optional filters"""
     stmt = select(Game).options(joinedload(Game.metrics))
@@ -36,21 +35,25 @@ async def list_games(
         # PostgreSQL JSONB contains
         stmt = stmt.where(Game.tags.op('@>')(f'["{tag.lower()}"]'))
     
+    # Полуоткрытый диапазон по самой колонке, чтобы работал индекс по created_at
     if from_date:
-        stmt = stmt.where(func.date(Game.created_at) >= from_date)
+        stmt = stmt.where(Game.created_at >= from_date)
     
     if to_date:
-        stmt = stmt.where(func.date(Game.created_at) <= to_date)
+        stmt = stmt.where(Game.created_at < to_date + timedelta(days=1))
     
     # Get total count
     count_stmt = select(func.count()).select_from(stmt.subquery())
-    total = db.execute(count_stmt).scalar()
     
     # Apply pagination
     stmt = stmt.order_by(Game.created_at.desc())
     stmt = stmt.offset((page - 1) * page_size).limit(page_size)
     
-    games = db.execute(stmt).unique().scalars().all()
+    # Count and page are independent: run them on separate sessions at once
+    total, games = await run_queries_concurrently(
+        lambda db: db.execute(count_stmt).scalar(),
+        lambda db: db.execute(stmt).unique().scalars().all()
+    )
     
     return GameListResponse(
         games=games,
@@ -5,13 +5,15 @@ from apps.api.deps import get_db_session
 
 router = APIRouter()
 
+PING_SQL = text("SELECT 1")
+
 
 @router.get("/health")
 async def health_check(db: Session = Depends(get_db_session)):
     """Health check endpoint"""
     try:
         # Test database connection
-        db.execute(text("SELECT 1"))
+        db.execute(PING_SQL)
         db_status = "healthy"
     except Exception as e:
         db_status = f"unhealthy: {str(e)}"
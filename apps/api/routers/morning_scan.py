@@ -10,6 +10,7 @@ from datetime import datetime
 
 from apps.db.session import get_db
 from apps.db.models_investor import PipelineRun
+from apps.api.task_queue import celery_app
 
 router = APIRouter(prefix="/morning-scan", tags=["Morning Scan"])
 
@@ -50,9 +51,8 @@ def run_morning_scan(request: MorningScanRequest, db: Session = Depends(get_db))
     db.commit()
     db.refresh(run)
     
-    # Launch task (import locally to avoid circular dependencies)
+    # Launch task (by name through the producer-only app: no worker imports in the API)
     try:
-        from apps.worker.celery_app import celery_app
         celery_app.send_task(
             'apps.worker.tasks.morning_scan.morning_scan_task',
             args=[str(run.id), request.dict()]
@@ -2,27 +2,41 @@
 Narrative Analysis API Router
 """
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session, joinedload
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, contains_eager
 from sqlalchemy import select, func
 from apps.db.session import get_db
 from apps.db.models import Game
-from apps.db.models_narrative import NarrativeAnalysis, PatternScore, FixabilityFlags
+from apps.db.models_narrative import NarrativeAnalysis, PatternScore, FixabilityFlags, WishlistData
+from apps.api.task_queue import celery_app
+from apps.api.cache import cache_get_json, cache_set_json
 from typing import List, Dict
+import os
 
-router = APIRouter(prefix="/narrative", tags=["narrative"])
+# Списки анализов крупные — сериализуем через orjson, как analytics
+router = APIRouter(prefix="/narrative", tags=["narrative"], default_response_class=ORJSONResponse)
+
+# /stats агрегирует анализы и оценки целиком на каждый заход; анализ идёт
+# пачками задач, поэтому минутная задержка допустима (как /analytics/stats)
+STATS_CACHE_KEY = "narrative:stats:v1"
+STATS_CACHE_TTL = int(os.getenv("NARRATIVE_STATS_CACHE_TTL_SECONDS", "60"))
 
 
 @router.get("/analyzed-games")
 def get_analyzed_games(db: Session = Depends(get_db)):
     """Get all games with narrative analysis"""
     
+    # Связи заполняются из тех же JOIN'ов, что фильтруют выборку
+    # (joinedload добавил бы к каждой таблице второй, анонимный JOIN)
     stmt = (
         select(Game)
         .join(NarrativeAnalysis)
         .join(PatternScore)
         .outerjoin(FixabilityFlags)
         .options(
-            joinedload(Game.narrative_analysis).joinedload(NarrativeAnalysis.pattern_score).joinedload(PatternScore.fixability_flags)
+            contains_eager(Game.narrative_analysis)
+            .contains_eager(NarrativeAnalysis.pattern_score)
+            .contains_eager(PatternScore.fixability_flags)
         )
     )
     
@@ -55,49 +69,66 @@ def get_analyzed_games(db: Session = Depends(get_db)):
 @router.get("/stats")
 def get_analysis_stats(db: Session = Depends(get_db)):
     """Get aggregate statistics"""
+    cached = cache_get_json(STATS_CACHE_KEY)
+    if cached is not None:
+        return cached
     
-    total = db.execute(select(func.count(NarrativeAnalysis.id))).scalar()
-    
-    category_counts = db.execute(
-        select(PatternScore.investor_category, func.count(PatternScore.id))
+    # Счётчик анализов, средний GAP и разбивка по категориям одной строкой
+    category_counts = (
+        select(
+            PatternScore.investor_category.label("category"),
+            func.count(PatternScore.id).label("games")
+        )
+        .where(PatternScore.investor_category.isnot(None))
         .group_by(PatternScore.investor_category)
-    ).all()
+        .subquery()
+    )
     
-    avg_gap = db.execute(select(func.avg(PatternScore.gap_score))).scalar() or 0
+    total, avg_gap, categories = db.execute(
+        select(
+            select(func.count(NarrativeAnalysis.id)).scalar_subquery(),
+            select(func.avg(PatternScore.gap_score)).scalar_subquery(),
+            select(
+                func.json_object_agg(category_counts.c.category, category_counts.c.games)
+            ).scalar_subquery()
+        )
+    ).one()
+    avg_gap = avg_gap or 0
     
-    return {
+    stats = {
         "total_analyzed": total,
-        "categories": {cat: count for cat, count in category_counts},
+        "categories": categories or {},
         "average_gap": round(float(avg_gap), 2)
     }
+    
+    cache_set_json(STATS_CACHE_KEY, stats, STATS_CACHE_TTL)
+    return stats
 
 
 @router.post("/discover")
 def trigger_discovery():
     """Запустить поиск новых игр вручную"""
-    from apps.worker.tasks.auto_discovery import discover_new_games
-    task = discover_new_games.delay()
+    task = celery_app.send_task('apps.worker.tasks.auto_discovery.discover_new_games')
     return {"status": "started", "task_id": str(task.id)}
 
 
 @router.post("/import-wishlist")
 def import_wishlist(csv_file: str, source: str = "steam"):
     """Импорт wishlist из CSV файла"""
-    from apps.worker.tasks.import_wishlist import import_wishlist_csv
-    task = import_wishlist_csv.delay(csv_file, source)
+    task = celery_app.send_task('apps.worker.tasks.import_wishlist.import_wishlist_csv', args=[csv_file, source])
     return {"status": "started", "task_id": str(task.id)}
 
 
 @router.get("/wishlist-stats")
 def get_wishlist_stats(db: Session = Depends(get_db)):
     """Статистика по wishlist данным"""
-    from apps.db.models_narrative import WishlistData
-    
-    total = db.execute(select(func.count(WishlistData.id))).scalar()
-    verified = db.execute(
-        select(func.count(WishlistData.id))
-        .where(WishlistData.mode == "verified")
-    ).scalar()
+    # Оба счётчика за один проход по таблице
+    total, verified = db.execute(
+        select(
+            func.count(WishlistData.id),
+            func.count(WishlistData.id).filter(WishlistData.mode == "verified")
+        )
+    ).one()
     
     return {
         "total_records": total,
@@ -109,16 +140,14 @@ def get_wishlist_stats(db: Session = Depends(get_db)):
 @router.post("/enrich-games")
 def trigger_enrichment():
     """Запустить обогащение данных игр"""
-    from apps.worker.tasks.enrich_game_data import enrich_all_games
-    task = enrich_all_games.delay()
+    task = celery_app.send_task('apps.worker.tasks.enrich_game_data.enrich_all_games')
     return {"status": "started", "task_id": str(task.id)}
 
 
 @router.post("/re-analyze")
 def trigger_re_analysis():
     """Перезапустить анализ для обогащённых игр"""
-    from apps.worker.tasks.enrich_game_data import re_analyze_enriched
-    task = re_analyze_enriched.delay()
+    task = celery_app.send_task('apps.worker.tasks.enrich_game_data.re_analyze_enriched')
     return {"status": "started", "task_id": str(task.id)}
 
 
@@ -165,8 +194,7 @@ def test_investment_scoring(game_id: str):
 @router.post("/trigger-daily-pipeline")
 def trigger_daily_pipeline():
     """Manually trigger daily pipeline"""
-    from apps.worker.tasks.daily_pipeline import daily_pipeline_task
-    task = daily_pipeline_task.apply_async()
+    task = celery_app.send_task('apps.worker.tasks.daily_pipeline.daily_pipeline_task')
     return {
         "status": "queued",
         "task_id": task.id,
@@ -176,8 +204,7 @@ def trigger_daily_pipeline():
 @router.post("/test-steam-collector")
 def test_steam_collector():
     """Test Steam collector"""
-    from apps.worker.tasks.collect_steam import collect_steam_task
-    task = collect_steam_task.apply_async()
+    task = celery_app.send_task('apps.worker.tasks.collect_steam.collect_steam_task')
     return {
         "status": "queued",
         "task_id": task.id,
@@ -187,8 +214,7 @@ def test_steam_collector():
 @router.post("/test-itch-collector")
 def test_itch_collector():
     """Test Itch collector"""
-    from apps.worker.tasks.collect_itch import collect_itch_task
-    task = collect_itch_task.apply_async()
+    task = celery_app.send_task('apps.worker.tasks.collect_itch.collect_itch_task')
     return {
         "status": "queued",
         "task_id": task.id,
@@ -197,7 +223,6 @@ def test_itch_collector():
 
 @router.post("/test-youtube-trends")
 def test_youtube_trends():
-    from apps.worker.celery_app import celery_app
     task = celery_app.send_task(
         'collect_youtube_trends',
         args=['indie_radar', 25]
@@ -206,8 +231,6 @@ def test_youtube_trends():
 
 @router.post("/test-trend-analysis")
 def test_trend_analysis():
-    from apps.worker.celery_app import celery_app
-    
     # Запустить все stages последовательно
     t1 = celery_app.send_task('collect_youtube_comments', args=[20, 50])
     t2 = celery_app.send_task('analyze_youtube_trends', args=['indie_radar'])
@@ -224,36 +247,30 @@ def test_trend_analysis():
 
 @router.post("/test-tiktok-trends")
 def test_tiktok_trends():
-    from apps.worker.celery_app import celery_app
     task = celery_app.send_task('collect_tiktok_trends', args=['indie_radar', 25])
     return {"status": "queued", "task_id": task.id}
 
 @router.post("/test-reddit-trends")
 def test_reddit_trends():
-    from apps.worker.celery_app import celery_app
     task = celery_app.send_task('collect_reddit_trends', args=['indie_radar', 20])
     return {"status": "queued", "task_id": task.id}
 
 @router.post("/test-twitter-trends")
 def test_twitter_trends():
-    from apps.worker.celery_app import celery_app
     task = celery_app.send_task('collect_twitter_trends', args=['indie_radar', 25])
     return {"status": "queued", "task_id": task.id}
 
 @router.post("/analyze-reddit-trends")
 def analyze_reddit_trends():
-    from apps.worker.celery_app import celery_app
     task = celery_app.send_task('analyze_reddit_trends', args=['indie_radar'])
     return {"status": "queued", "task_id": task.id}
 
 @router.post("/save-daily-snapshot")
 def save_daily_snapshot():
-    from apps.worker.celery_app import celery_app
     task = celery_app.send_task('save_daily_snapshot')
     return {"status": "queued", "task_id": task.id}
 
 @router.post("/calculate-weekly-aggregates")
 def calculate_weekly():
-    from apps.worker.celery_app import celery_app
     task = celery_app.send_task('calculate_weekly_aggregates')
     return {"status": "queued", "task_id": task.id}
@@ -76,15 +76,23 @@ async def list_pitches(
     if to_date:
         stmt = stmt.where(Pitch.created_at <= to_date)
     
-    # Get total count
+    # Total count rides along on every row (window runs before LIMIT),
+    # so the page and the count come from one scan and always agree
     count_stmt = select(func.count()).select_from(stmt.subquery())
-    total = db.execute(count_stmt).scalar()
+    stmt = stmt.add_columns(func.count().over().label("total"))
     
     # Apply pagination
     stmt = stmt.order_by(Pitch.created_at.desc())
     stmt = stmt.offset((page - 1) * page_size).limit(page_size)
     
-    pitches = db.execute(stmt).scalars().all()
+    rows = db.execute(stmt).all()
+    pitches = [pitch for pitch, _ in rows]
+    
+    if rows:
+        total = rows[0].total
+    else:
+        # Past the last page there is no row to carry the count
+        total = db.execute(count_stmt).scalar() if page > 1 else 0
     
     return PitchListResponse(
         pitches=pitches,
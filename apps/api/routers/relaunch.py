@@ -5,13 +5,55 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from apps.api.deps import get_db_session
 
-router = APIRouter(prefix="/relaunch", tags=["relaunch"])
+router = APIRouter(prefix="/relaunch", tags=["relaunch"], default_response_class=ORJSONResponse)
+
+# Fixed statements are built once at import, not on every request
+TRACKED_COUNT_SQL = text("SELECT COUNT(*) FROM relaunch_apps WHERE is_active = true")
+APP_DETAILS_SQL = text("SELECT id, steam_app_id, name, added_at FROM relaunch_apps WHERE id = :id")
+APP_BY_STEAM_ID_SQL = text("SELECT id FROM relaunch_apps WHERE steam_app_id = :steam_app_id LIMIT 1")
+INSERT_APP_SQL = text("""
+    INSERT INTO relaunch_apps (steam_app_id, name, tracking_priority)
+    VALUES (:sid, :name, :priority)
+    RETURNING id
+""")
+
+# Fix Postgres AmbiguousParameter: avoid `:classification IS NULL` checks —
+# the classification filter is a separate statement instead.
+# Top-N scores are picked first, so relaunch_apps is joined for at most :limit rows
+CANDIDATES_SQL_TEMPLATE = """
+    WITH top AS (
+        SELECT app_id, relaunch_score, classification, failure_reasons,
+               relaunch_angles, reasoning_text, computed_at
+        FROM relaunch_scores
+        WHERE relaunch_score >= :min_score{classification_filter}
+        ORDER BY relaunch_score DESC
+        LIMIT :limit
+    )
+    SELECT
+        ra.id as app_id,
+        ra.steam_app_id,
+        ra.name,
+        top.relaunch_score,
+        top.classification,
+        top.failure_reasons,
+        top.relaunch_angles,
+        top.reasoning_text,
+        top.computed_at
+    FROM top
+    JOIN relaunch_apps ra ON top.app_id = ra.id
+    ORDER BY top.relaunch_score DESC
+"""
+CANDIDATES_SQL = text(CANDIDATES_SQL_TEMPLATE.format(classification_filter=""))
+CANDIDATES_BY_CLASSIFICATION_SQL = text(CANDIDATES_SQL_TEMPLATE.format(
+    classification_filter=" AND classification = :classification"
+))
 
 
 class TrackAppRequest(BaseModel):
@@ -22,12 +64,11 @@ class TrackAppRequest(BaseModel):
 
 @router.get("/health")
 def relaunch_health(db: Session = Depends(get_db_session)) -> Dict[str, Any]:
-    count_query = text("SELECT COUNT(*) FROM relaunch_apps WHERE is_active = true")
-    tracked = db.execute(count_query).scalar() or 0
+    tracked = db.execute(TRACKED_COUNT_SQL).scalar_one()
     return {
         "status": "healthy",
         "tracked_apps": int(tracked),
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": datetime.utcnow(),
     }
 
 
@@ -38,32 +79,13 @@ def get_candidates(
     limit: int = Query(50, ge=1, le=200),
     db: Session = Depends(get_db_session),
 ) -> List[Dict[str, Any]]:
-    # Fix Postgres AmbiguousParameter: avoid `:classification IS NULL` checks
-    sql = """
-        SELECT
-            ra.id as app_id,
-            ra.steam_app_id,
-            ra.name,
-            rs.relaunch_score,
-            rs.classification,
-            rs.failure_reasons,
-            rs.relaunch_angles,
-            rs.reasoning_text,
-            rs.computed_at
-        FROM relaunch_scores rs
-        JOIN relaunch_apps ra ON rs.app_id = ra.id
-        WHERE rs.relaunch_score >= :min_score
-    """
-
     params: Dict[str, Any] = {"min_score": float(min_score), "limit": int(limit)}
 
     if classification:
-        sql += " AND rs.classification = :classification"
         params["classification"] = classification
-
-    sql += " ORDER BY rs.relaunch_score DESC LIMIT :limit"
-
-    rows = db.execute(text(sql), params).fetchall()
+        rows = db.execute(CANDIDATES_BY_CLASSIFICATION_SQL, params)
+    else:
+        rows = db.execute(CANDIDATES_SQL, params)
 
     return [
         {
@@ -89,10 +111,7 @@ def get_app_details(app_id: str, db: Session = Depends(get_db_session)) -> Dict[
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid app_id format")
 
-    app = db.execute(
-        text("SELECT id, steam_app_id, name, added_at FROM relaunch_apps WHERE id = :id"),
-        {"id": app_uuid},
-    ).fetchone()
+    app = db.execute(APP_DETAILS_SQL, {"id": app_uuid}).one_or_none()
 
     if not app:
         raise HTTPException(status_code=404, detail="App not found")
@@ -111,24 +130,17 @@ def get_app_details(app_id: str, db: Session = Depends(get_db_session)) -> Dict[
 
 @router.post("/admin/track")
 def track_app(request: TrackAppRequest, db: Session = Depends(get_db_session)) -> Dict[str, Any]:
-    existing = db.execute(
-        text("SELECT id FROM relaunch_apps WHERE steam_app_id = :steam_app_id"),
-        {"steam_app_id": request.steam_app_id},
-    ).fetchone()
+    existing_id = db.execute(
+        APP_BY_STEAM_ID_SQL, {"steam_app_id": request.steam_app_id}
+    ).scalar_one_or_none()
 
-    if existing:
-        return {"status": "exists", "app_id": str(existing[0])}
+    if existing_id:
+        return {"status": "exists", "app_id": str(existing_id)}
 
     new_id = db.execute(
-        text(
-            """
-            INSERT INTO relaunch_apps (steam_app_id, name, tracking_priority)
-            VALUES (:sid, :name, :priority)
-            RETURNING id
-            """
-        ),
+        INSERT_APP_SQL,
         {"sid": request.steam_app_id, "name": request.name, "priority": request.tracking_priority},
-    ).scalar()
+    ).scalar_one()
 
     db.commit()
     return {"status": "ok", "app_id": str(new_id)}
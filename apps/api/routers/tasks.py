@@ -1,14 +1,15 @@
 from fastapi import APIRouter, HTTPException
 from typing import Dict
 
+from apps.api.task_queue import celery_app
+
 router = APIRouter()
 
 @router.post("/collect/steam")
 async def trigger_steam_collection() -> Dict[str, str]:
     """Trigger Steam data collection"""
     try:
-        from apps.worker.tasks.collect_steam import collect_steam_task
-        task = collect_steam_task.delay()
+        task = celery_app.send_task('apps.worker.tasks.collect_steam.collect_steam_task')
         return {
             "status": "queued",
             "task_id": str(task.id),
@@ -21,8 +22,7 @@ async def trigger_steam_collection() -> Dict[str, str]:
 async def trigger_itch_collection() -> Dict[str, str]:
     """Trigger Itch.io data collection"""
     try:
-        from apps.worker.tasks.collect_itch import collect_itch_task
-        task = collect_itch_task.delay()
+        task = celery_app.send_task('apps.worker.tasks.collect_itch.collect_itch_task')
         return {
             "status": "queued",
             "task_id": str(task.id),
@@ -11,7 +11,7 @@ router = APIRouter()
 
 
 @router.get("/today", response_model=TrendListResponse)
-async def get_today_trends(
+def get_today_trends(
     limit: int = Query(50, ge=1, le=200),
     db: Session = Depends(get_db_session)
 ):
@@ -33,7 +33,7 @@ async def get_today_trends(
 
 
 @router.get("", response_model=TrendListResponse)
-async def get_trends(
+def get_trends(
     from_date: date = Query(..., description="Start date"),
     to_date: date = Query(None, description="End date (defaults to today)"),
     signal: str = Query(None, description="Filter by signal"),
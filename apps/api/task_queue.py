@@ -0,0 +1,21 @@
+"""
+Producer-only Celery app for the API.
+
+Same broker and serializers as apps.worker.celery_app, but without importing
+task modules: the API only enqueues tasks by name via send_task, so booting it
+must not pull in the worker and every collector's dependencies.
+"""
+from celery import Celery
+import os
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+celery_app = Celery("game_scout", broker=REDIS_URL, backend=REDIS_URL)
+
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    result_serializer="json",
+    timezone=os.getenv("TZ", "Europe/Madrid"),
+    enable_utc=True,
+)
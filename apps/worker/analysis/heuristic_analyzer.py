@@ -42,6 +42,30 @@ class HeuristicNarrativeAnalyzer:
     HUMILIATION_REVENGE_KEYWORDS = ['revenge', 'payback', 'justice', 'vengeance', 'betray']
     MYSTERY_REVELATION_KEYWORDS = ['mystery', 'discover', 'investigate', 'solve', 'puzzle', 'detective']
     
+    # Слова, по которым hook считается выражающим паттерн
+    HOOK_KEYWORDS = WEAK_STRONG_KEYWORDS + THREAT_SAFETY_KEYWORDS
+    
+    # Состояние игрока до/после паттерна
+    STATES_BEFORE = {
+        'threat_to_safety': 'Vulnerable, exposed to danger',
+        'weak_to_strong': 'Powerless, lacking capability',
+        'chaos_to_order': 'Overwhelmed by disorder',
+        'loss_to_compensation': 'Missing something important',
+        'forbidden_to_violation': 'Constrained, limited',
+        'humiliation_to_revenge': 'Dishonored, wronged',
+        'mystery_to_revelation': 'Confused, lacking knowledge'
+    }
+    
+    STATES_AFTER = {
+        'threat_to_safety': 'Safe, secured',
+        'weak_to_strong': 'Powerful, capable',
+        'chaos_to_order': 'In control, organized',
+        'loss_to_compensation': 'Restored, fulfilled',
+        'forbidden_to_violation': 'Free, unrestricted',
+        'humiliation_to_revenge': 'Vindicated, avenged',
+        'mystery_to_revelation': 'Enlightened, knowledgeable'
+    }
+    
     def analyze_game(self, game_data: Dict) -> Dict:
         """Полный эвристический анализ игры"""
         
@@ -203,7 +227,7 @@ class HeuristicNarrativeAnalyzer:
         
         # Для менее известных игр - смотрим на описание
         short_desc = game_data.get('short_description', '')[:200].lower()
-        hook_has_pattern = any(kw in short_desc for kw in self.WEAK_STRONG_KEYWORDS + self.THREAT_SAFETY_KEYWORDS)
+        hook_has_pattern = any(kw in short_desc for kw in self.HOOK_KEYWORDS)
         hook_clarity = 8 if hook_has_pattern else 4
         
         # Trailer alignment
@@ -282,29 +306,11 @@ class HeuristicNarrativeAnalyzer:
     
     def _infer_state_before(self, pattern: Optional[str]) -> str:
         """Вывод состояния игрока ДО"""
-        states = {
-            'threat_to_safety': 'Vulnerable, exposed to danger',
-            'weak_to_strong': 'Powerless, lacking capability',
-            'chaos_to_order': 'Overwhelmed by disorder',
-            'loss_to_compensation': 'Missing something important',
-            'forbidden_to_violation': 'Constrained, limited',
-            'humiliation_to_revenge': 'Dishonored, wronged',
-            'mystery_to_revelation': 'Confused, lacking knowledge'
-        }
-        return states.get(pattern, 'Unknown state')
+        return self.STATES_BEFORE.get(pattern, 'Unknown state')
     
     def _infer_state_after(self, pattern: Optional[str]) -> str:
         """Вывод состояния игрока ПОСЛЕ"""
-        states = {
-            'threat_to_safety': 'Safe, secured',
-            'weak_to_strong': 'Powerful, capable',
-            'chaos_to_order': 'In control, organized',
-            'loss_to_compensation': 'Restored, fulfilled',
-            'forbidden_to_violation': 'Free, unrestricted',
-            'humiliation_to_revenge': 'Vindicated, avenged',
-            'mystery_to_revelation': 'Enlightened, knowledgeable'
-        }
-        return states.get(pattern, 'Transformed state')
+        return self.STATES_AFTER.get(pattern, 'Transformed state')
     
     def _get_pp_breakdown(self, narrative: Dict, pattern: Dict) -> Dict:
         """Детализация PP"""
@@ -3,6 +3,24 @@ Investment Reasoning Generator
 Генерация объяснений почему игра интересна для инвестора
 """
 
+# Переводы паттернов (статичные, собираются один раз при импорте)
+LEVEL_NAMES = {
+    'biological': 'биологическом уровне (выживание)',
+    'social': 'социальном уровне (отношения)',
+    'identity': 'уровне идентичности (самореализация)',
+    'meta': 'мета-уровне (осознание)'
+}
+
+PATTERN_NAMES = {
+    'threat_to_safety': 'Угроза → Безопасность (выживание)',
+    'weak_to_strong': 'Слабый → Сильный (прокачка)',
+    'chaos_to_order': 'Хаос → Порядок (строительство)',
+    'loss_to_compensation': 'Потеря → Компенсация (восстановление)',
+    'forbidden_to_violation': 'Запрет → Нарушение (свобода)',
+    'humiliation_to_revenge': 'Унижение → Месть (возмездие)',
+    'mystery_to_revelation': 'Тайна → Откровение (познание)'
+}
+
 
 def generate_investment_reasoning(game_data: dict, analysis_result: dict) -> str:
     """
@@ -22,26 +40,8 @@ def generate_investment_reasoning(game_data: dict, analysis_result: dict) -> str
     primary_level = narrative.get('primary_level')
     primary_pattern = pattern.get('primary_pattern')
     
-    # Переводы паттернов
-    level_names = {
-        'biological': 'биологическом уровне (выживание)',
-        'social': 'социальном уровне (отношения)',
-        'identity': 'уровне идентичности (самореализация)',
-        'meta': 'мета-уровне (осознание)'
-    }
-    
-    pattern_names = {
-        'threat_to_safety': 'Угроза → Безопасность (выживание)',
-        'weak_to_strong': 'Слабый → Сильный (прокачка)',
-        'chaos_to_order': 'Хаос → Порядок (строительство)',
-        'loss_to_compensation': 'Потеря → Компенсация (восстановление)',
-        'forbidden_to_violation': 'Запрет → Нарушение (свобода)',
-        'humiliation_to_revenge': 'Унижение → Месть (возмездие)',
-        'mystery_to_revelation': 'Тайна → Откровение (познание)'
-    }
-    
-    level_desc = level_names.get(primary_level, 'эмоциональном уровне')
-    pattern_desc = pattern_names.get(primary_pattern, 'трансформации игрока')
+    level_desc = LEVEL_NAMES.get(primary_level, 'эмоциональном уровне')
+    pattern_desc = PATTERN_NAMES.get(primary_pattern, 'трансформации игрока')
     
     # Генерируем объяснение в зависимости от категории
     
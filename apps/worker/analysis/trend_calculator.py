@@ -1,7 +1,7 @@
-from sqlalchemy import select, desc
+from sqlalchemy import select
 from apps.db.models import GameMetricsDaily
-from datetime import datetime, timedelta
-from typing import Dict
+from datetime import date, timedelta
+from typing import Dict, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,25 +9,26 @@ logger = logging.getLogger(__name__)
 class TrendCalculator:
     """Calculate trends and momentum for games"""
     
-    def calculate_game_trends(self, game_id: str, db) -> Dict:
-        """Calculate 7-day and 30-day trends for a game"""
+    def calculate_game_trends(self, game_id: str, db, today: Optional[date] = None) -> Dict:
+        """Calculate 7-day and 30-day trends for a game
+        
+        Batch callers pass `today` taken once per run instead of reading the clock per game.
+        """
         try:
             # Get last 30 days of metrics
-            thirty_days_ago = datetime.now() - timedelta(days=30)
+            thirty_days_ago = (today or date.today()) - timedelta(days=30)
             
+            # Ascending by date, as the calculations below expect
             stmt = select(GameMetricsDaily).where(
                 GameMetricsDaily.game_id == game_id,
                 GameMetricsDaily.date >= thirty_days_ago
-            ).order_by(desc(GameMetricsDaily.date))
+            ).order_by(GameMetricsDaily.date)
             
             metrics = db.execute(stmt).scalars().all()
             
             if len(metrics) < 2:
                 return {"status": "insufficient_data"}
             
-            # Sort by date ascending for calculations
-            metrics = sorted(metrics, key=lambda x: x.date)
-            
             latest = metrics[-1]
             week_ago = metrics[-7] if len(metrics) >= 7 else metrics[0]
             month_ago = metrics[0]
@@ -51,6 +51,20 @@ celery_app.conf.beat_schedule = {
         "task": "apps.worker.tasks.export_sheets.export_sheets_task",
         "schedule": crontab(hour=7, minute=30),
     },
+    "refresh-dashboard-snapshot": {
+        "task": "apps.worker.tasks.refresh_dashboard_snapshot.refresh_dashboard_snapshot_task",
+        "schedule": 30.0,
+    },
+    # Снимок трендов и investor_overview_cache за сегодня; upsert идемпотентен,
+    # поэтому раз в час — обзор успевает за сборами трендов в течение дня
+    "save-daily-snapshot-hourly": {
+        "task": "save_daily_snapshot",
+        "schedule": crontab(minute=5),
+    },
+    "refresh-collection-stats": {
+        "task": "apps.worker.tasks.refresh_collection_stats.refresh_collection_stats_task",
+        "schedule": 300.0,
+    },
 }
 ## # from apps.worker.tasks import deep_analysis
 
@@ -62,3 +76,5 @@ from apps.worker.tasks.analyze_video_comments import analyze_video_comments_task
 from apps.worker.tasks.score_game_investment import score_game_investment_task  # noqa
 from apps.worker.tasks.daily_pipeline import daily_pipeline_task  # noqa
 from apps.worker.tasks.morning_scan import morning_scan_task  # noqa
+from apps.worker.tasks.refresh_dashboard_snapshot import refresh_dashboard_snapshot_task  # noqa
+from apps.worker.tasks.refresh_collection_stats import refresh_collection_stats_task  # noqa
@@ -1,38 +1,118 @@
 import httpx
 import time
 import logging
-from typing import Optional
-from tenacity import retry, stop_after_attempt, wait_exponential
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
 import os
 
 logger = logging.getLogger(__name__)
 
+# Status codes Steam/itch use when they start refusing a scraper
+BLOCKED_STATUS_CODES = {403, 429}
+
+
+class HostBlockedError(Exception):
+    """Host answered 403/429; later requests to it wait out the cooldown"""
+
+
+class CachedPage(NamedTuple):
+    """What a conditional GET needs: the validators and the body they vouch for"""
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_type: Optional[str]
+    content: bytes
+
 
 class RateLimitedHTTPClient:
     """HTTP client with rate limiting and retries"""
     
     def __init__(self):
         self.rate_limit = float(os.getenv("SCRAPE_RATE_LIMIT_PER_HOST", "1"))
+        self.burst = max(1, int(os.getenv("SCRAPE_BURST_PER_HOST", "3")))
         self.timeout = int(os.getenv("SCRAPE_TIMEOUT_SECONDS", "20"))
         self.user_agent = os.getenv("USER_AGENT", "GameScoutBot/1.0")
-        self.last_request_time = {}
+        self.default_headers = {
+            "User-Agent": self.user_agent,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "en-US,en;q=0.5",
+        }
+        # One pooled client for all requests and retries (keep-alive, no TLS re-handshake)
+        self.client = httpx.Client(timeout=self.timeout, follow_redirects=True)
+        # Token bucket per host: host -> (tokens, last refill time)
+        self.buckets = {}
+        self._lock = threading.Lock()
+        # Conditional GET cache: url -> CachedPage of the last 200 carrying
+        # ETag/Last-Modified; bounded by entries and by total body bytes
+        self.validator_cache_size = int(os.getenv("SCRAPE_VALIDATOR_CACHE_SIZE", "512"))
+        self.validator_cache_bytes = int(os.getenv("SCRAPE_VALIDATOR_CACHE_BYTES", str(8 * 1024 * 1024)))
+        self.validator_cache = OrderedDict()
+        self.validator_cache_used = 0
+        # Negative cache: host -> time until which requests to it wait
+        self.block_cooldown = float(os.getenv("SCRAPE_BLOCK_COOLDOWN_SECONDS", "60"))
+        self.blocked_until = {}
         
     def _wait_for_rate_limit(self, host: str):
-        """Wait to respect rate limit for host"""
-        now = time.time()
-        last_time = self.last_request_time.get(host, 0)
-        elapsed = now - last_time
+        """Take a token from the host's bucket, sleeping until one is available.
         
-        if elapsed < self.rate_limit:
-            sleep_time = self.rate_limit - elapsed
-            logger.debug(f"Rate limiting: sleeping {sleep_time:.2f}s for {host}")
+        Tokens refill at one per `rate_limit` seconds up to `burst`, so short
+        bursts go out immediately while the sustained rate stays the same.
+        """
+        while True:
+            with self._lock:
+                now = time.time()
+                tokens, last = self.buckets.get(host, (float(self.burst), now))
+                if self.rate_limit > 0:
+                    tokens = min(float(self.burst), tokens + (now - last) / self.rate_limit)
+                else:
+                    tokens = float(self.burst)
+                if tokens >= 1:
+                    self.buckets[host] = (tokens - 1, now)
+                    return
+                self.buckets[host] = (tokens, now)
+                sleep_time = (1 - tokens) * self.rate_limit
+            logger.debug("Rate limiting: sleeping %.2fs for %s", sleep_time, host)
             time.sleep(sleep_time)
-        
-        self.last_request_time[host] = time.time()
+    
+    def _wait_for_block(self, host: str):
+        """Sleep until the host's cooldown after a 403/429 is over"""
+        while True:
+            with self._lock:
+                remaining = self.blocked_until.get(host, 0) - time.time()
+            if remaining <= 0:
+                return
+            logger.info("%s is cooling down: sleeping %.0fs", host, remaining)
+            time.sleep(remaining)
+    
+    def _drain_bucket(self, host: str):
+        """Empty the host's bucket after a 429 so the next calls back off"""
+        with self._lock:
+            self.buckets[host] = (0.0, time.time())
+    
+    def _remember_validators(self, url: str, response: httpx.Response):
+        """Keep pages that can be revalidated with a conditional GET"""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        with self._lock:
+            previous = self.validator_cache.pop(url, None)
+            if previous is not None:
+                self.validator_cache_used -= len(previous.content)
+            if not (etag or last_modified) or len(response.content) > self.validator_cache_bytes:
+                return
+            self.validator_cache[url] = CachedPage(
+                etag, last_modified, response.headers.get("Content-Type"), response.content
+            )
+            self.validator_cache_used += len(response.content)
+            while (len(self.validator_cache) > self.validator_cache_size
+                   or self.validator_cache_used > self.validator_cache_bytes):
+                _, evicted = self.validator_cache.popitem(last=False)
+                self.validator_cache_used -= len(evicted.content)
     
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
+        retry=retry_if_not_exception_type(HostBlockedError),
         reraise=True
     )
     def get(self, url: str, headers: Optional[dict] = None) -> httpx.Response:
@@ -41,25 +121,52 @@ class RateLimitedHTTPClient:
         parsed = httpx.URL(url)
         host = parsed.host
         
+        # Don't spend requests on a host that just blocked us: wait it out
+        self._wait_for_block(host)
+        
         # Wait for rate limit
         self._wait_for_rate_limit(host)
         
         # Prepare headers
-        req_headers = {
-            "User-Agent": self.user_agent,
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.5",
-        }
+        req_headers = dict(self.default_headers)
         if headers:
             req_headers.update(headers)
         
+        # Revalidate instead of re-downloading when we hold a previous copy
+        with self._lock:
+            cached = self.validator_cache.get(url)
+        if cached is not None:
+            if cached.etag:
+                req_headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                req_headers["If-Modified-Since"] = cached.last_modified
+        
         # Make request
         logger.info(f"GET {url}")
         try:
-            with httpx.Client(timeout=self.timeout, follow_redirects=True) as client:
-                response = client.get(url, headers=req_headers)
-                response.raise_for_status()
-                return response
+            response = self.client.get(url, headers=req_headers)
+            if response.status_code == 304 and cached is not None:
+                logger.debug("Not modified: %s", url)
+                # Each caller gets its own Response built from the stored body
+                return httpx.Response(
+                    200,
+                    headers={"Content-Type": cached.content_type} if cached.content_type else None,
+                    content=cached.content,
+                    request=response.request,
+                )
+            response.raise_for_status()
+            self._remember_validators(url, response)
+            return response
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 429:
+                self._drain_bucket(host)
+            if e.response.status_code in BLOCKED_STATUS_CODES:
+                with self._lock:
+                    self.blocked_until[host] = time.time() + self.block_cooldown
+                logger.error(f"{host} answered {e.response.status_code}, pausing it for {self.block_cooldown:.0f}s")
+                raise HostBlockedError(str(e)) from e
+            logger.error(f"HTTP error for {url}: {e}")
+            raise
         except httpx.HTTPError as e:
             logger.error(f"HTTP error for {url}: {e}")
             raise
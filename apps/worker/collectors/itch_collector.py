@@ -1,4 +1,4 @@
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from typing import List, Dict, Optional
 import logging
 import re
@@ -7,6 +7,9 @@ from apps.worker.collectors.http_client import http_client
 
 logger = logging.getLogger(__name__)
 
+# Listing pages: parse only the game cells, not the surrounding site chrome
+GAME_CELL_STRAINER = SoupStrainer('div', attrs={'class': 'game_cell'})
+
 
 class ItchCollector:
     """Light itch.io scraper for trending games"""
@@ -24,7 +27,7 @@ class ItchCollector:
             # Fetch the games page sorted by popular
             url = f"{self.BASE_URL}/games/top-rated"
             response = http_client.get(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(response.text, 'html.parser', parse_only=GAME_CELL_STRAINER)
             
             # Find game cards
             game_cells = soup.find_all('div', class_='game_cell', limit=limit)
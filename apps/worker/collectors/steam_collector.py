@@ -1,13 +1,18 @@
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from typing import List, Dict, Optional
 import logging
 import re
 from datetime import datetime
-import time
 from apps.worker.collectors.http_client import http_client
 
 logger = logging.getLogger(__name__)
 
+APP_HREF_RE = re.compile(r'/app/(\d+)')
+PRICE_RE = re.compile(r'(\d+[.,]\d+)')
+# Only search result rows (and their children) are needed from the listing;
+# skipping head, scripts and store chrome keeps the parse tree small.
+SEARCH_ROW_STRAINER = SoupStrainer('a', attrs={'class': 'search_result_row'})
+
 class SteamDeepCollector:
     BASE_URL = "https://store.steampowered.com"
     CATEGORIES = {
@@ -18,12 +23,17 @@ class SteamDeepCollector:
     
     def collect_comprehensive(self, games_per_category: int = 50) -> List[Dict]:
         all_games = []
+        # The same app often ranks in several categories; keep the first hit
+        # so downstream storage and SteamSpy lookups run once per app.
+        seen_ids = set()
         for cat_name, cat_param in self.CATEGORIES.items():
             logger.info(f"Collecting: {cat_name}")
             try:
                 games = self._collect_category(cat_name, cat_param, games_per_category)
-                all_games.extend(games)
-                time.sleep(2)
+                for game in games:
+                    if game["source_id"] not in seen_ids:
+                        seen_ids.add(game["source_id"])
+                        all_games.append(game)
             except Exception as e:
                 logger.error(f"Failed {cat_name}: {e}")
         logger.info(f"Collected {len(all_games)} games")
@@ -34,7 +44,7 @@ class SteamDeepCollector:
         url = f"{self.BASE_URL}/search/?{cat_param}&ndl=1"
         try:
             response = http_client.get(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(response.text, 'html.parser', parse_only=SEARCH_ROW_STRAINER)
             results = soup.find_all('a', class_='search_result_row', limit=limit)
             
             for idx, result in enumerate(results):
@@ -52,7 +62,7 @@ class SteamDeepCollector:
     def _parse_game_card(self, card, rank: int, category: str) -> Optional[Dict]:
         try:
             href = card.get('href', '')
-            match = re.search(r'/app/(\d+)', href)
+            match = APP_HREF_RE.search(href)
             if not match:
                 return None
             
@@ -68,7 +78,7 @@ class SteamDeepCollector:
                 if "free" in text.lower():
                     price = 0.0
                 else:
-                    m = re.search(r'(\d+[.,]\d+)', text)
+                    m = PRICE_RE.search(text)
                     if m:
                         price = float(m.group(1).replace(',', '.'))
             
@@ -1,41 +1,43 @@
-import requests
+import httpx
 from bs4 import BeautifulSoup
 import re
 import logging
-import time
+from apps.worker.collectors.http_client import HostBlockedError, http_client
 
 logger = logging.getLogger(__name__)
 
+WISHLIST_TEXT_PATTERNS = [
+    re.compile(r'([\d,]+)\s+people\s+have\s+this\s+(?:game\s+)?on\s+their\s+wishlist', re.IGNORECASE),
+    re.compile(r'([\d,]+)\s+(?:users?\s+)?(?:have\s+)?wishlisted\s+this', re.IGNORECASE),
+]
+WISHLIST_JSON_RE = re.compile(r'"wishlistCount":\s*(\d+)')
+WISHLIST_CLASS_RE = re.compile('wishlist', re.I)
+COUNT_RE = re.compile(r'([\d,]+)')
+
 class SteamWishlistParser:
     """Parse wishlist counts from Steam store pages"""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        # Запросы идут через общий клиент (лимит на хост), заголовки — свои
+        self.headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept-Language': 'en-US,en;q=0.9',
-        })
+        }
     
     def get_wishlist_count(self, appid: str) -> int:
         """Try to extract wishlist count from Steam store page"""
         try:
             url = f"https://store.steampowered.com/app/{appid}/"
             
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
+            response = http_client.get(url, headers=self.headers)
             
             # Парсим HTML
             soup = BeautifulSoup(response.text, 'html.parser')
             
             # Метод 1: Ищем в тексте "X people have this on their wishlist"
-            wishlist_patterns = [
-                r'([\d,]+)\s+people\s+have\s+this\s+(?:game\s+)?on\s+their\s+wishlist',
-                r'([\d,]+)\s+(?:users?\s+)?(?:have\s+)?wishlisted\s+this',
-            ]
-            
             page_text = soup.get_text()
-            for pattern in wishlist_patterns:
-                match = re.search(pattern, page_text, re.IGNORECASE)
+            for pattern in WISHLIST_TEXT_PATTERNS:
+                match = pattern.search(page_text)
                 if match:
                     count_str = match.group(1).replace(',', '')
                     count = int(count_str)
@@ -46,17 +48,17 @@ class SteamWishlistParser:
             scripts = soup.find_all('script', type='application/ld+json')
             for script in scripts:
                 if 'wishlist' in script.string.lower():
-                    match = re.search(r'"wishlistCount":\s*(\d+)', script.string)
+                    match = WISHLIST_JSON_RE.search(script.string)
                     if match:
                         count = int(match.group(1))
                         logger.info(f"Found wishlist in JSON for {appid}: {count:,}")
                         return count
             
             # Метод 3: Проверяем специфичные div'ы
-            wishlist_divs = soup.find_all('div', class_=re.compile('wishlist', re.I))
+            wishlist_divs = soup.find_all('div', class_=WISHLIST_CLASS_RE)
             for div in wishlist_divs:
                 text = div.get_text()
-                match = re.search(r'([\d,]+)', text)
+                match = COUNT_RE.search(text)
                 if match:
                     count_str = match.group(1).replace(',', '')
                     if count_str.isdigit() and int(count_str) > 100:
@@ -67,7 +69,7 @@ class SteamWishlistParser:
             logger.debug(f"No wishlist count found for {appid}")
             return None
             
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, HostBlockedError) as e:
             logger.warning(f"HTTP error for {appid}: {e}")
             return None
         except Exception as e:
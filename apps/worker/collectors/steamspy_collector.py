@@ -1,6 +1,8 @@
-import requests
 import logging
+import orjson
 from typing import Dict, Optional
+from urllib.parse import urlencode
+from apps.worker.collectors.http_client import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -16,9 +18,9 @@ class SteamSpyCollector:
                 "appid": appid
             }
             
-            response = requests.get(self.BASE_URL, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            # Общий клиент: лимит запросов на хост вместо sleep в вызывающем коде
+            response = http_client.get(f"{self.BASE_URL}?{urlencode(params)}")
+            data = orjson.loads(response.content)
             
             if not data or 'name' not in data:
                 return None
@@ -102,7 +102,7 @@ class LLMClient:
             
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse LLM JSON response: {e}")
-            logger.debug(f"Raw response: {response}")
+            logger.debug("Raw response: %s", response)
             return None
 
 
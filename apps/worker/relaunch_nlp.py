@@ -19,25 +19,8 @@ class ReviewClassifier:
     def classify_review(self, review_text: str, is_positive: bool) -> Dict:
         text_lower = review_text.lower()
         
-        signals = {
-            "broken_game": False,
-            "marketing_fail": False,
-            "underrated": False,
-            "expectation_mismatch": False,
-            "has_loop": False,
-            "has_systems": False,
-            "dev_positive": False,
-        }
-        
-        match_counts = {
-            "broken_game": 0,
-            "marketing_fail": 0,
-            "underrated": 0,
-            "expectation_mismatch": 0,
-            "loop": 0,
-            "systems": 0,
-            "dev_positive": 0,
-        }
+        # Every config category starts at zero; signals are derived once below
+        match_counts = dict.fromkeys(self.patterns, 0)
         
         matches = {}
         
@@ -51,13 +34,15 @@ class ReviewClassifier:
             if category_matches:
                 matches[category] = category_matches[:5]
         
-        signals["broken_game"] = match_counts["broken_game"] >= 2
-        signals["marketing_fail"] = match_counts["marketing_fail"] >= 1
-        signals["underrated"] = match_counts["underrated"] >= 1
-        signals["expectation_mismatch"] = match_counts["expectation_mismatch"] >= 1
-        signals["has_loop"] = match_counts["loop"] >= 1
-        signals["has_systems"] = match_counts["systems"] >= 1
-        signals["dev_positive"] = match_counts["dev_positive"] >= 1
+        signals = {
+            "broken_game": match_counts["broken_game"] >= 2,
+            "marketing_fail": match_counts["marketing_fail"] >= 1,
+            "underrated": match_counts["underrated"] >= 1,
+            "expectation_mismatch": match_counts["expectation_mismatch"] >= 1,
+            "has_loop": match_counts["loop"] >= 1,
+            "has_systems": match_counts["systems"] >= 1,
+            "dev_positive": match_counts["dev_positive"] >= 1,
+        }
         
         sentiment_score = 0.5 if is_positive else -0.5
         if signals["broken_game"]:
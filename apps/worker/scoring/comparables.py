@@ -1,11 +1,19 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, func, or_, text
 from apps.db.models import Game, GameMetricsDaily
 from typing import List, Dict, Set
 import logging
 
 logger = logging.getLogger(__name__)
 
+GAME_SCAN_BATCH_SIZE = 500
+
+LATEST_METRICS_SQL = text("""
+    SELECT game_id, reviews_total
+    FROM mv_latest_game_metrics
+    WHERE game_id = ANY(CAST(:game_ids AS uuid[]))
+""")
+
 
 def jaccard_similarity(set1: Set[str], set2: Set[str]) -> float:
     """Compute Jaccard similarity between two sets"""
@@ -48,18 +56,17 @@ def find_comparables(
     if hook_text:
         pitch_keywords.update(tokenize(hook_text))
     
-    # Get all games with their latest metrics
-    stmt = select(Game)
-    games = db.execute(stmt).scalars().all()
-    
-    if not games:
-        logger.warning("No games found in database")
-        return []
+    # Stream all games through a server-side cursor in chunks instead of
+    # materializing the whole catalogue before scoring
+    stmt = select(Game).execution_options(yield_per=GAME_SCAN_BATCH_SIZE)
+    games = db.execute(stmt).scalars()
     
     # Score each game
     scored_games = []
+    games_seen = 0
     
     for game in games:
+        games_seen += 1
         try:
             # Jaccard on tags
             game_tag_set = {tag.lower().strip() for tag in game.tags if tag}
@@ -74,13 +81,6 @@ def find_comparables(
             combined_score = (tag_similarity * 0.7) + (keyword_similarity * 0.3)
             
             if combined_score > 0:
-                # Get latest metrics
-                stmt = select(GameMetricsDaily).where(
-                    GameMetricsDaily.game_id == game.id
-                ).order_by(GameMetricsDaily.date.desc()).limit(1)
-                
-                latest_metric = db.execute(stmt).scalar_one_or_none()
-                
                 comparable = {
                     "game_id": str(game.id),
                     "name": game.name,
@@ -90,8 +90,8 @@ def find_comparables(
                     "release_date": str(game.release_date) if game.release_date else None,
                     "price_eur": float(game.price_eur) if game.price_eur else None,
                     "similarity_score": round(combined_score, 3),
-                    "reviews_total": latest_metric.reviews_total if latest_metric else 0,
-                    "rating_percent": latest_metric.rating_percent if latest_metric else None
+                    "reviews_total": 0,
+                    "rating_percent": None
                 }
                 
                 scored_games.append(comparable)
@@ -100,10 +100,25 @@ def find_comparables(
             logger.warning(f"Error scoring game {game.name}: {e}")
             continue
     
+    if not games_seen:
+        logger.warning("No games found in database")
+        return []
+    
     # Sort by similarity score and limit
     scored_games.sort(key=lambda x: x["similarity_score"], reverse=True)
     top_comparables = scored_games[:limit]
     
+    # Latest metrics only for the games we return, in one query against the
+    # materialized view instead of one ORDER BY date LIMIT 1 per candidate.
+    if top_comparables:
+        rows = db.execute(
+            LATEST_METRICS_SQL,
+            {"game_ids": [c["game_id"] for c in top_comparables]}
+        ).all()
+        reviews_by_game = {str(game_id): reviews_total for game_id, reviews_total in rows}
+        for comparable in top_comparables:
+            comparable["reviews_total"] = reviews_by_game.get(comparable["game_id"]) or 0
+    
     logger.info(f"Found {len(top_comparables)} comparables")
     
     return top_comparables
\ No newline at end of file
@@ -25,6 +25,25 @@ GENRE_COEFFICIENTS = {
     "mmorpg": 3.0,
 }
 
+# Компонент fixability breakdown -> описание слабости для отчёта
+FIXABLE_WEAKNESS_MESSAGES = {
+    "weak_hook": "Hook is generic/unclear - needs emotional angle",
+    "no_video": "Missing gameplay video",
+    "no_demo": "No playable demo for testing",
+    "poor_description": "Pitch lacks structure/clarity",
+    "unclear_genre": "Genre positioning unclear",
+}
+
+# Профиль -> шаблон краткого решения (поля: pp, gtm, gap, fix, flags)
+DECISION_SUMMARY_TEMPLATES = {
+    "UNDERMARKETED_GEM": "Strong product (PP={pp:.1f}) with major marketing gap (GAP={gap:.1f}). High fixability (FIX={fix:.1f}). Prime investment opportunity.",
+    "STRONG_BALANCED": "Excellent product and marketing execution (PP={pp:.1f}, GTM={gtm:.1f}). Well-balanced pitch ready for investment.",
+    "MARKETING_FIXABLE": "Solid product (PP={pp:.1f}) with fixable marketing issues (GAP={gap:.1f}, FIX={fix:.1f}). Good upside potential.",
+    "PRODUCT_RISK": "Product concerns (PP={pp:.1f}) or overpromising detected (GAP={gap:.1f}). Core gameplay needs validation.",
+    "TEAM_RISK": "Delivery risk detected: {flags}. Consider team augmentation.",
+}
+DEFAULT_DECISION_SUMMARY = "Fundamental issues (PP={pp:.1f}, FIX={fix:.1f}) or critical flags. Not suitable for investment."
+
 
 def clamp(x: float, lo: float = 0.0, hi: float = 10.0) -> float:
     return max(lo, min(hi, x))
@@ -449,17 +468,9 @@ def _identify_fixable_weaknesses(
     weaknesses = []
     
     for key, value in fix_bd.items():
-        if value > 0:
-            if key == "weak_hook":
-                weaknesses.append("Hook is generic/unclear - needs emotional angle")
-            elif key == "no_video":
-                weaknesses.append("Missing gameplay video")
-            elif key == "no_demo":
-                weaknesses.append("No playable demo for testing")
-            elif key == "poor_description":
-                weaknesses.append("Pitch lacks structure/clarity")
-            elif key == "unclear_genre":
-                weaknesses.append("Genre positioning unclear")
+        message = FIXABLE_WEAKNESS_MESSAGES.get(key)
+        if value > 0 and message:
+            weaknesses.append(message)
     
     return weaknesses[:6]
 
@@ -502,25 +513,13 @@ def _generate_decision_summary(
     flags: List[Dict[str, Any]]
 ) -> str:
     """Краткое объяснение решения"""
+    template = DECISION_SUMMARY_TEMPLATES.get(profile, DEFAULT_DECISION_SUMMARY)
     
-    if profile == "UNDERMARKETED_GEM":
-        return f"Strong product (PP={pp:.1f}) with major marketing gap (GAP={gap:.1f}). High fixability (FIX={fix:.1f}). Prime investment opportunity."
-    
-    elif profile == "STRONG_BALANCED":
-        return f"Excellent product and marketing execution (PP={pp:.1f}, GTM={pp-gap:.1f}). Well-balanced pitch ready for investment."
-    
-    elif profile == "MARKETING_FIXABLE":
-        return f"Solid product (PP={pp:.1f}) with fixable marketing issues (GAP={gap:.1f}, FIX={fix:.1f}). Good upside potential."
-    
-    elif profile == "PRODUCT_RISK":
-        return f"Product concerns (PP={pp:.1f}) or overpromising detected (GAP={gap:.1f}). Core gameplay needs validation."
-    
-    elif profile == "TEAM_RISK":
+    flag_str = ""
+    if profile == "TEAM_RISK":
         flag_str = ", ".join(f.get("code", "") for f in flags[:2]) if flags else "weak team signals"
-        return f"Delivery risk detected: {flag_str}. Consider team augmentation."
     
-    else:
-        return f"Fundamental issues (PP={pp:.1f}, FIX={fix:.1f}) or critical flags. Not suitable for investment."
+    return template.format(pp=pp, gtm=pp - gap, gap=gap, fix=fix, flags=flag_str)
 
 
 def _compute_legacy_score(
@@ -9,6 +9,28 @@ import re
 
 logger = logging.getLogger(__name__)
 
+# Ключевые слова механик и тем для подсчёта упоминаний в постах
+MECHANIC_KEYWORDS = {
+    'roguelike': ['roguelike', 'roguelite', 'rogue-like'],
+    'deckbuilder': ['deckbuilder', 'deck builder', 'card game', 'tcg'],
+    'metroidvania': ['metroidvania', 'metroid'],
+    'survival': ['survival', 'survive'],
+    'extraction': ['extraction', 'tarkov-like'],
+    'automation': ['automation', 'factory', 'satisfactory-like'],
+    'souls-like': ['souls-like', 'soulslike', 'dark souls'],
+    'city-builder': ['city builder', 'city building', 'settlement'],
+    'tower-defense': ['tower defense', 'td game']
+}
+
+THEME_KEYWORDS = {
+    'cozy': ['cozy', 'chill', 'relaxing', 'wholesome'],
+    'horror': ['horror', 'scary', 'creepy', 'psychological'],
+    'cyberpunk': ['cyberpunk', 'neon', 'dystopian'],
+    'fantasy': ['fantasy', 'medieval', 'magic'],
+    'sci-fi': ['sci-fi', 'space', 'futuristic'],
+    'pixel-art': ['pixel art', '8-bit', '16-bit', 'retro']
+}
+
 @celery_app.task(name="analyze_reddit_trends")
 def analyze_reddit_trends_task(query_set='indie_radar'):
     db = get_db_session()
@@ -97,35 +119,14 @@ def deep_analyze_posts(posts_today, posts_week):
     mechanics_counter = Counter()
     themes_counter = Counter()
     
-    keywords_mechanics = {
-        'roguelike': ['roguelike', 'roguelite', 'rogue-like'],
-        'deckbuilder': ['deckbuilder', 'deck builder', 'card game', 'tcg'],
-        'metroidvania': ['metroidvania', 'metroid'],
-        'survival': ['survival', 'survive'],
-        'extraction': ['extraction', 'tarkov-like'],
-        'automation': ['automation', 'factory', 'satisfactory-like'],
-        'souls-like': ['souls-like', 'soulslike', 'dark souls'],
-        'city-builder': ['city builder', 'city building', 'settlement'],
-        'tower-defense': ['tower defense', 'td game']
-    }
-    
-    keywords_themes = {
-        'cozy': ['cozy', 'chill', 'relaxing', 'wholesome'],
-        'horror': ['horror', 'scary', 'creepy', 'psychological'],
-        'cyberpunk': ['cyberpunk', 'neon', 'dystopian'],
-        'fantasy': ['fantasy', 'medieval', 'magic'],
-        'sci-fi': ['sci-fi', 'space', 'futuristic'],
-        'pixel-art': ['pixel art', '8-bit', '16-bit', 'retro']
-    }
-    
     for post in posts_today:
         text = (post.title + ' ' + (post.text or '')).lower()
         
-        for mechanic, keywords in keywords_mechanics.items():
+        for mechanic, keywords in MECHANIC_KEYWORDS.items():
             if any(kw in text for kw in keywords):
                 mechanics_counter[mechanic] += post.score or 1
         
-        for theme, keywords in keywords_themes.items():
+        for theme, keywords in THEME_KEYWORDS.items():
             if any(kw in text for kw in keywords):
                 themes_counter[theme] += post.score or 1
     
@@ -136,7 +137,7 @@ def deep_analyze_posts(posts_today, posts_week):
     week_mechanics = Counter()
     for post in posts_week:
         text = (post.title + ' ' + (post.text or '')).lower()
-        for mechanic, keywords in keywords_mechanics.items():
+        for mechanic, keywords in MECHANIC_KEYWORDS.items():
             if any(kw in text for kw in keywords):
                 week_mechanics[mechanic] += 1
     
@@ -16,7 +16,7 @@ from apps.db.models_investor import (
     ExternalSignalDaily
 )
 from sqlalchemy import select
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 
 logger = logging.getLogger(__name__)
@@ -141,7 +141,6 @@ def update_external_signal_daily(db, game_id: str, platform: str):
     Агрегирует данные из всех проанализированных видео
     """
     from apps.db.models import Game
-    from sqlalchemy import func
     
     logger.info(f"Updating ExternalSignalDaily for game {game_id}, platform {platform}")
     
@@ -194,11 +193,14 @@ def update_external_signal_daily(db, game_id: str, platform: str):
             'videos_count': len(videos)
         }
         
-        # Найти или создать ExternalSignalDaily
-        today = datetime.utcnow().date()
+        # Найти или создать ExternalSignalDaily.
+        # Полуоткрытый диапазон вместо date(col) = today: индекс по date остаётся применим
+        now = datetime.utcnow()
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
         stmt = select(ExternalSignalDaily).where(
             ExternalSignalDaily.game_id == game_id,
-            func.date(ExternalSignalDaily.date) == today
+            ExternalSignalDaily.date >= day_start,
+            ExternalSignalDaily.date < day_start + timedelta(days=1)
         )
         
         daily_signal = db.execute(stmt).scalar_one_or_none()
@@ -218,7 +220,7 @@ def update_external_signal_daily(db, game_id: str, platform: str):
             # Создать новый
             daily_signal = ExternalSignalDaily(
                 game_id=game_id,
-                date=datetime.utcnow(),
+                date=now,
                 youtube_signal=signal if platform == 'youtube' else None,
                 tiktok_signal=signal if platform == 'tiktok' else None,
                 videos_analyzed=len(videos),
@@ -6,11 +6,15 @@ from apps.db.session import get_db_session
 from apps.db.models import Game, GameSource
 from apps.worker.tasks.collect_steam import collect_steam_task
 from apps.worker.tasks.collect_itch import collect_itch_task
-from sqlalchemy import select
+from sqlalchemy import exists, select
+from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Игр за один запуск: каждая — отдельный вызов LLM
+ANALYZE_PAGE_SIZE = 50
+
 
 @celery_app.task(name="apps.worker.tasks.auto_discovery.discover_new_games")
 def discover_new_games():
@@ -39,9 +43,13 @@ def discover_new_games():
 
 
 @celery_app.task(name="apps.worker.tasks.auto_discovery.analyze_new_games")
-def analyze_new_games():
+def analyze_new_games(page_size: int = ANALYZE_PAGE_SIZE, after_id: Optional[str] = None):
     """
     Автоматический анализ всех игр без анализа
+    
+    Страницы по id (keyset): пока страница полная, задача ставит себя же
+    со следующим after_id, так что запуск без курсора проходит весь хвост,
+    а игры, на которых анализ упал, не забирают следующие страницы.
     """
     from apps.worker.tasks.analyze_narrative import analyze_game_narrative
     from apps.db.models_narrative import NarrativeAnalysis
@@ -52,13 +60,15 @@ def analyze_new_games():
         db = get_db_session()
         
         try:
-            # Найти игры без анализа
+            # Найти игры без анализа (NOT EXISTS — anti-join без материализации строк анализа)
             stmt = (
                 select(Game)
-                .outerjoin(NarrativeAnalysis, Game.id == NarrativeAnalysis.game_id)
-                .where(NarrativeAnalysis.id == None)
-                .limit(50)
+                .where(~exists().where(NarrativeAnalysis.game_id == Game.id))
+                .order_by(Game.id)
+                .limit(page_size)
             )
+            if after_id:
+                stmt = stmt.where(Game.id > after_id)
             
             games = db.execute(stmt).scalars().all()
             
@@ -83,11 +93,19 @@ def analyze_new_games():
                     logger.error(f"Error analyzing {game.title}: {e}")
                     continue
             
+            # None — дошли до конца
+            next_after_id = str(games[-1].id) if len(games) == page_size else None
+            if next_after_id:
+                analyze_new_games.apply_async(
+                    kwargs={"page_size": page_size, "after_id": next_after_id}
+                )
+            
             return {
                 "status": "success",
                 "analyzed": analyzed,
                 "failed": failed,
-                "total": len(games)
+                "total": len(games),
+                "next_after_id": next_after_id
             }
             
         finally:
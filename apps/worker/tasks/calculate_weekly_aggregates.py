@@ -18,65 +18,62 @@ def calculate_weekly_aggregates_task():
         today = date.today()
         week_start = today - timedelta(days=7)
         
-        # Получить тренды за неделю
-        trends = db.execute(text("""
-            SELECT 
-                trend_name,
-                AVG(trend_score) as avg_score,
-                SUM(video_count + post_count) as total_mentions,
-                COUNT(DISTINCT date) as days_present,
-                STDDEV(trend_score) as score_stddev
-            FROM trend_daily_snapshot
-            WHERE date >= :week_start AND date <= :today
-            GROUP BY trend_name
-            HAVING COUNT(*) >= 3
-            ORDER BY avg_score DESC
-        """), {'week_start': week_start, 'today': today}).fetchall()
-        
-        for row in trends:
-            name, avg_score, mentions, days, stddev = row
-            
-            # Рассчитать индекс стабильности (чем меньше отклонение, тем стабильнее)
-            stability = 1.0 - min(float(stddev or 0) / float(avg_score or 1), 1.0) if avg_score else 0
-            
-            # Получить прошлонедельный score для расчёта роста
-            prev_week = db.execute(text("""
-                SELECT AVG(trend_score) 
+        # Тренды за неделю вместе с прошлой неделей одним запросом;
+        # стабильность и рост считаются прямо в SQL, и агрегаты сразу
+        # upsert'ятся на сервере — без построчных INSERT из Python
+        saved = db.execute(text("""
+            INSERT INTO trend_weekly_aggregate 
+            (week_start, week_end, trend_name, avg_score, growth_rate, stability_index, total_mentions)
+            WITH current_week AS (
+                SELECT 
+                    trend_name,
+                    AVG(trend_score) as avg_score,
+                    SUM(video_count + post_count) as total_mentions,
+                    STDDEV(trend_score) as score_stddev
                 FROM trend_daily_snapshot
-                WHERE trend_name = :name 
-                AND date >= :prev_start AND date < :week_start
-            """), {
-                'name': name,
-                'prev_start': week_start - timedelta(days=7),
-                'week_start': week_start
-            }).fetchone()
-            
-            prev_avg = prev_week[0] if prev_week and prev_week[0] else avg_score
-            growth_rate = ((avg_score - prev_avg) / prev_avg * 100) if prev_avg > 0 else 0
-            
-            # Сохранить агрегат
-            db.execute(text("""
-                INSERT INTO trend_weekly_aggregate 
-                (week_start, week_end, trend_name, avg_score, growth_rate, stability_index, total_mentions)
-                VALUES (:start, :end, :name, :avg, :growth, :stability, :mentions)
-                ON CONFLICT (week_start, trend_name) DO UPDATE
-                SET avg_score = EXCLUDED.avg_score,
-                    growth_rate = EXCLUDED.growth_rate,
-                    stability_index = EXCLUDED.stability_index,
-                    total_mentions = EXCLUDED.total_mentions
-            """), {
-                'start': week_start,
-                'end': today,
-                'name': name,
-                'avg': float(avg_score),
-                'growth': float(growth_rate),
-                'stability': float(stability),
-                'mentions': int(mentions)
-            })
+                WHERE date >= :week_start AND date <= :today
+                GROUP BY trend_name
+                HAVING COUNT(*) >= 3
+            ),
+            prev_week AS (
+                SELECT trend_name, NULLIF(AVG(trend_score), 0) as prev_avg
+                FROM trend_daily_snapshot
+                WHERE date >= :prev_start AND date < :week_start
+                GROUP BY trend_name
+            )
+            SELECT 
+                :week_start,
+                :today,
+                c.trend_name,
+                c.avg_score,
+                -- Рост к прошлой неделе (без данных за прошлую неделю — 0)
+                CASE 
+                    WHEN COALESCE(p.prev_avg, c.avg_score) > 0
+                    THEN (c.avg_score - COALESCE(p.prev_avg, c.avg_score)) / COALESCE(p.prev_avg, c.avg_score) * 100
+                    ELSE 0
+                END,
+                -- Индекс стабильности (чем меньше отклонение, тем стабильнее)
+                CASE 
+                    WHEN COALESCE(c.avg_score, 0) = 0 THEN 0
+                    ELSE 1.0 - LEAST(COALESCE(c.score_stddev, 0) / c.avg_score, 1.0)
+                END,
+                c.total_mentions
+            FROM current_week c
+            LEFT JOIN prev_week p ON p.trend_name = c.trend_name
+            ON CONFLICT (week_start, trend_name) DO UPDATE
+            SET avg_score = EXCLUDED.avg_score,
+                growth_rate = EXCLUDED.growth_rate,
+                stability_index = EXCLUDED.stability_index,
+                total_mentions = EXCLUDED.total_mentions
+        """), {
+            'week_start': week_start,
+            'prev_start': week_start - timedelta(days=7),
+            'today': today
+        }).rowcount
         
         db.commit()
-        logger.info(f"✅ Calculated {len(trends)} weekly aggregates")
-        return {"status": "success", "trends": len(trends)}
+        logger.info(f"✅ Calculated {saved} weekly aggregates")
+        return {"status": "success", "trends": saved}
         
     except Exception as e:
         logger.error(f"Weekly aggregate error: {e}", exc_info=True)
@@ -3,9 +3,13 @@ from apps.db.session import get_db_session
 from apps.db.models_youtube import RedditTrendPost
 from sqlalchemy import text
 import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
+FETCH_WORKERS = int(os.getenv("REDDIT_FETCH_WORKERS", "3"))
+
 QUERY_SETS = {
     'indie_radar': ["indie game", "upcoming indie", "indie game recommendation"],
     'genre_radar': ["cozy game", "roguelike", "survival game"],
@@ -30,37 +34,15 @@ def collect_reddit_trends_task(query_set='indie_radar', max_per_query=50):
         queries = QUERY_SETS.get(query_set, QUERY_SETS['indie_radar'])
         total = 0
         
-        for query in queries:
-            posts = scraper.search_posts(query, limit=max_per_query)
-            
-            for post_data in posts:
-                # ИСПРАВЛЕНИЕ: Проверить существует ли пост
-                existing = db.query(RedditTrendPost).filter_by(post_id=post_data['post_id']).first()
-                
-                if existing:
-                    # Обновить query/query_set если нужно
-                    existing.query = query
-                    existing.query_set = query_set
-                else:
-                    # Создать новый
-                    post = RedditTrendPost(
-                        post_id=post_data['post_id'],
-                        title=post_data['title'],
-                        url=post_data['url'],
-                        subreddit=post_data['subreddit'],
-                        author=post_data['author'],
-                        score=post_data['score'],
-                        num_comments=post_data['num_comments'],
-                        upvote_ratio=post_data['upvote_ratio'],
-                        text=post_data['text'],
-                        query=query,
-                        query_set=query_set
-                    )
-                    db.add(post)
+        # Запросы независимы: скрейпим их в пуле потоков, а запись в БД
+        # остаётся в этом потоке — сессия SQLAlchemy не потокобезопасна
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+            fetched = pool.map(lambda q: scraper.search_posts(q, limit=max_per_query), queries)
             
-            db.commit()
-            total += len(posts)
-            logger.info(f"Collected {len(posts)} Reddit posts for '{query}'")
+            for query, posts in zip(queries, fetched):
+                store_query_posts(db, query, query_set, posts)
+                total += len(posts)
+                logger.info(f"Collected {len(posts)} Reddit posts for '{query}'")
         
         db.execute(text("""
             UPDATE trend_collection_history 
@@ -84,3 +66,41 @@ def collect_reddit_trends_task(query_set='indie_radar', max_per_query=50):
         return {"status": "error", "error": str(e)}
     finally:
         db.close()
+
+
+def store_query_posts(db, query: str, query_set: str, posts: list):
+    """Записать посты одного запроса (новые — вставить, известные — перепривязать)"""
+    # Уже сохранённые посты одним запросом вместо SELECT на каждый пост
+    known = {
+        post.post_id: post
+        for post in db.query(RedditTrendPost).filter(
+            RedditTrendPost.post_id.in_([p['post_id'] for p in posts])
+        )
+    } if posts else {}
+    
+    for post_data in posts:
+        existing = known.get(post_data['post_id'])
+        
+        if existing:
+            # Обновить query/query_set если нужно
+            existing.query = query
+            existing.query_set = query_set
+        else:
+            # Создать новый
+            post = RedditTrendPost(
+                post_id=post_data['post_id'],
+                title=post_data['title'],
+                url=post_data['url'],
+                subreddit=post_data['subreddit'],
+                author=post_data['author'],
+                score=post_data['score'],
+                num_comments=post_data['num_comments'],
+                upvote_ratio=post_data['upvote_ratio'],
+                text=post_data['text'],
+                query=query,
+                query_set=query_set
+            )
+            db.add(post)
+            known[post.post_id] = post
+    
+    db.commit()
@@ -6,13 +6,18 @@ from apps.db.session import get_db_session
 from apps.db.models import Game, GameSource
 from apps.db.models_investor import WishlistSignalDaily
 from sqlalchemy import select
-from bs4 import BeautifulSoup
 import requests
 import logging
+import re
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# Открывающий тег строки выдачи (<a ... class="search_result_row ...">) и appid
+# внутри него: карусели и прочие виджеты страницы тоже несут data-ds-appid
+SEARCH_ROW_RE = re.compile(rb'<a\s[^>]*\bclass="search_result_row\b[^>]*>')
+SEARCH_APPID_RE = re.compile(rb'data-ds-appid="([\d,]+)"')
+
 
 @celery_app.task(name="apps.worker.tasks.collect_wishlist_ranks.collect_wishlist_ranks_task")
 def collect_wishlist_ranks_task():
@@ -37,17 +42,20 @@ def collect_wishlist_ranks_task():
             top_wishlisted = fetch_top_wishlisted(limit=100)
             results["top_wishlisted"] = len(top_wishlisted)
             
-            for rank, appid in enumerate(top_wishlisted, start=1):
-                save_wishlist_signal(db, appid, rank, "top_wishlisted")
-                results["new_signals"] += 1
-            
             # 2. Собрать Popular Upcoming
             logger.info("🔥 Fetching Popular Upcoming...")
             popular_upcoming = fetch_popular_upcoming(limit=100)
             results["popular_upcoming"] = len(popular_upcoming)
             
+            # Игры для всех appid обоих списков одним IN-запросом
+            games = load_steam_games(db, top_wishlisted + popular_upcoming)
+            
+            for rank, appid in enumerate(top_wishlisted, start=1):
+                save_wishlist_signal(db, games.get(appid), appid, rank, "top_wishlisted")
+                results["new_signals"] += 1
+            
             for rank, appid in enumerate(popular_upcoming, start=1):
-                save_wishlist_signal(db, appid, rank, "popular_upcoming")
+                save_wishlist_signal(db, games.get(appid), appid, rank, "popular_upcoming")
                 results["new_signals"] += 1
             
             db.commit()
@@ -66,90 +74,95 @@ def collect_wishlist_ranks_task():
 def fetch_top_wishlisted(limit: int = 100) -> list:
     """
     Парсинг Steam Top Wishlisted page
-    Возвращает: [(appid, rank), ...]
+    Возвращает: [appid, ...] в порядке ранга
     """
-    url = "https://store.steampowered.com/search/"
-    params = {
-        "filter": "popularwishlist",
-        "hidef2p": "1",
-        "ndl": "1"
-    }
-    
-    try:
-        response = requests.get(url, params=params, timeout=15, headers={
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)'
-        })
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        results = soup.find_all('a', class_='search_result_row', limit=limit)
-        
-        appids = []
-        for result in results:
-            data_ds_appid = result.get('data-ds-appid')
-            if data_ds_appid:
-                appids.append(data_ds_appid)
-        
-        logger.info(f"Found {len(appids)} games in Top Wishlisted")
-        return appids
-        
-    except Exception as e:
-        logger.error(f"Failed to fetch Top Wishlisted: {e}")
-        return []
+    return fetch_search_appids("popularwishlist", "Top Wishlisted", limit)
 
 
 def fetch_popular_upcoming(limit: int = 100) -> list:
     """
     Парсинг Steam Popular Upcoming page
     """
+    return fetch_search_appids("comingsoon", "Popular Upcoming", limit)
+
+
+def fetch_search_appids(search_filter: str, label: str, limit: int = 100) -> list:
+    """
+    Общий парсер Steam search: appid в порядке выдачи, без дублей
+    """
     url = "https://store.steampowered.com/search/"
     params = {
-        "filter": "comingsoon",
+        "filter": search_filter,
         "hidef2p": "1",
         "ndl": "1"
     }
     
     try:
-        response = requests.get(url, params=params, timeout=15, headers={
+        # Читаем страницу потоком и останавливаемся, как только прошли limit
+        # строк выдачи — остаток HTML (футер, скрипты) не скачиваем и не парсим
+        with requests.get(url, params=params, timeout=15, stream=True, headers={
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)'
-        })
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.text, 'html.parser')
-        results = soup.find_all('a', class_='search_result_row', limit=limit)
-        
-        appids = []
-        for result in results:
-            data_ds_appid = result.get('data-ds-appid')
-            if data_ds_appid:
-                appids.append(data_ds_appid)
+        }) as response:
+            response.raise_for_status()
+            appids = parse_search_appids(response.iter_content(chunk_size=8192), limit)
         
-        logger.info(f"Found {len(appids)} games in Popular Upcoming")
+        logger.info(f"Found {len(appids)} games in {label}")
         return appids
         
     except Exception as e:
-        logger.error(f"Failed to fetch Popular Upcoming: {e}")
+        logger.error(f"Failed to fetch {label}: {e}")
         return []
 
 
-def save_wishlist_signal(db, appid: str, rank: int, source: str):
+def parse_search_appids(chunks, limit: int) -> list:
     """
-    Сохранить wishlist signal + вычислить EWI
+    appid из первых limit строк search_result_row, по порядку и без дублей
     """
-    # Найти игру по appid
+    # dict сохраняет порядок (= ранг) и даёт O(1) проверку дублей
+    seen = {}
+    rows = 0
+    buf = bytearray()
+    for chunk in chunks:
+        buf += chunk
+        pos = 0
+        for match in SEARCH_ROW_RE.finditer(buf):
+            rows += 1
+            pos = match.end()
+            appid_match = SEARCH_APPID_RE.search(match.group(0))
+            if appid_match:
+                seen.setdefault(appid_match.group(1).decode(), None)
+            if rows >= limit:
+                return list(seen)
+        # Тег мог разрезаться границей чанка: оставляем всё с последнего
+        # начатого после pos тега, сколько бы байт он ни занимал
+        tail = buf.rfind(b'<', pos)
+        del buf[:tail if tail != -1 else len(buf)]
+    return list(seen)
+
+
+def load_steam_games(db, appids: list) -> dict:
+    """Steam-игры для appid из выдачи одним IN-запросом: appid -> Game"""
+    if not appids:
+        return {}
     stmt = select(Game).where(
         Game.source == GameSource.steam,
-        Game.source_id == appid
+        Game.source_id.in_(set(appids))
     )
-    game = db.execute(stmt).scalar_one_or_none()
-    
+    return {game.source_id: game for game in db.execute(stmt).scalars()}
+
+
+def save_wishlist_signal(db, game, appid: str, rank: int, source: str):
+    """
+    Сохранить wishlist signal + вычислить EWI
+    """
     if not game:
-        logger.debug(f"Game not found for appid {appid}, skipping")
+        logger.debug("Game not found for appid %s, skipping", appid)
         return
     
     # Получить предыдущие ранки для дельт
-    yesterday = datetime.utcnow() - timedelta(days=1)
-    week_ago = datetime.utcnow() - timedelta(days=7)
+    now = datetime.utcnow()
+    yesterday = now - timedelta(days=1)
+    week_ago = now - timedelta(days=7)
     
     stmt = select(WishlistSignalDaily).where(
         WishlistSignalDaily.game_id == game.id,
@@ -175,7 +188,7 @@ def save_wishlist_signal(db, appid: str, rank: int, source: str):
     # Создать новый сигнал
     signal = WishlistSignalDaily(
         game_id=game.id,
-        date=datetime.utcnow(),
+        date=now,
         rank=rank,
         rank_source=source,
         rank_delta_24h=rank_delta_24h,
@@ -37,9 +37,16 @@ def collect_youtube_trend_videos_task(query_set='indie_radar', max_per_query=25)
         for query in queries:
             videos = client.search_videos(query, max_per_query)
             
+            # Уже сохранённые видео одним запросом вместо SELECT на каждое
+            known = {
+                video.video_id: video
+                for video in db.query(YouTubeTrendVideo).filter(
+                    YouTubeTrendVideo.video_id.in_([v['video_id'] for v in videos])
+                )
+            } if videos else {}
+            
             for video_data in videos:
-                # Проверить существует ли
-                existing = db.query(YouTubeTrendVideo).filter_by(video_id=video_data['video_id']).first()
+                existing = known.get(video_data['video_id'])
                 
                 if existing:
                     # Обновить
@@ -62,6 +69,7 @@ def collect_youtube_trend_videos_task(query_set='indie_radar', max_per_query=25)
                         query_set=query_set
                     )
                     db.add(video)
+                    known[video.video_id] = video
             
             db.commit()
             total_videos += len(videos)
@@ -20,7 +20,8 @@ def compute_trends_task():
     try:
         # Get all games collected today
         stmt = select(Game).where(
-            func.date(Game.created_at) == today
+            Game.created_at >= today,
+            Game.created_at < today + timedelta(days=1)
         )
         games = db.execute(stmt).scalars().all()
         
@@ -38,33 +39,50 @@ def compute_trends_task():
         
         logger.info(f"Found {len(tag_counter)} unique tags from {len(games)} games")
         
+        # Игры без тегов: истории искать не для чего
+        if not tag_counter:
+            return {"status": "no_data", "count": 0, "date": str(today)}
+        
+        # История за 7 дней по всем тегам одним запросом: окно по signal даёт
+        # среднее за период и последнюю строку (вчерашний delta_7d) без
+        # отдельного SELECT на каждый тег
+        seven_days_ago = today - timedelta(days=7)
+        window = dict(partition_by=TrendsDaily.signal)
+        history = select(
+            TrendsDaily.signal,
+            TrendsDaily.delta_7d,
+            func.avg(TrendsDaily.count).over(**window).label("avg_7d"),
+            func.row_number().over(**window, order_by=TrendsDaily.date.desc()).label("recency")
+        ).where(
+            TrendsDaily.signal.in_(list(tag_counter)),
+            TrendsDaily.date >= seven_days_ago,
+            TrendsDaily.date < today
+        ).subquery()
+        
+        history_by_signal = {
+            signal: (float(avg_7d), last_delta)
+            for signal, avg_7d, last_delta in db.execute(
+                select(history.c.signal, history.c.avg_7d, history.c.delta_7d)
+                .where(history.c.recency == 1)
+            )
+        }
+        
         # Compute trends for each tag
         trends_created = 0
         
         for signal, count in tag_counter.items():
             try:
-                # Get last 7 days of data for this signal
-                seven_days_ago = today - timedelta(days=7)
-                stmt = select(TrendsDaily).where(
-                    TrendsDaily.signal == signal,
-                    TrendsDaily.date >= seven_days_ago,
-                    TrendsDaily.date < today
-                ).order_by(TrendsDaily.date.desc())
-                
-                historical = db.execute(stmt).scalars().all()
-                
                 # Compute avg_7d
-                if historical:
-                    avg_7d = sum(h.count for h in historical) / len(historical)
+                if signal in history_by_signal:
+                    avg_7d, yesterday_delta = history_by_signal[signal]
                 else:
-                    avg_7d = 0.0
+                    avg_7d, yesterday_delta = 0.0, None
                 
                 # Compute delta_7d
                 delta_7d = count - avg_7d
                 
                 # Compute velocity (change in delta)
-                if len(historical) >= 1:
-                    yesterday_delta = historical[0].delta_7d
+                if signal in history_by_signal:
                     velocity = delta_7d - yesterday_delta
                 else:
                     velocity = delta_7d
@@ -15,10 +15,25 @@ from apps.db.models import Game
 from apps.db.models_investor import ExternalVideo
 from sqlalchemy import select
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Шаги 1-3 по дорожкам: дорожки идут параллельно, шаги внутри — по очереди.
+# Steam и wishlist оба ходят в store.steampowered.com, поэтому делят одну
+# дорожку и не удваивают частоту запросов к Steam (403/429); Itch — отдельно.
+# (ключ в results["steps"], название для логов, задача)
+COLLECTION_LANES = (
+    (
+        ("steam", "Steam collection", collect_steam_task),
+        ("wishlist", "Wishlist collection", collect_wishlist_ranks_task),
+    ),
+    (
+        ("itch", "Itch collection", collect_itch_task),
+    ),
+)
+
 
 @celery_app.task(name="apps.worker.tasks.daily_pipeline.daily_pipeline_task")
 def daily_pipeline_task():
@@ -29,6 +44,7 @@ def daily_pipeline_task():
     1. Collect Steam games (новые игры)
     2. Collect Itch games
     3. Collect Wishlist Ranks (EWI)
+       (Itch параллельно со Steam и wishlist)
     4. Для новых игр: YouTube + TikTok
     5. Analyze comments (если есть LLM)
     6. Score investments
@@ -41,44 +57,11 @@ def daily_pipeline_task():
     }
     
     try:
-        # STEP 1: Collect Steam Games
-        logger.info("Step 1: Collecting Steam games...")
-        try:
-            steam_result = collect_steam_task.apply()
-            results["steps"]["steam"] = {
-                "status": "success",
-                "result": steam_result.get() if steam_result else None
-            }
-            logger.info(f"✅ Steam collection: {results['steps']['steam']}")
-        except Exception as e:
-            logger.error(f"❌ Steam collection failed: {e}")
-            results["steps"]["steam"] = {"status": "error", "error": str(e)}
-        
-        # STEP 2: Collect Itch Games
-        logger.info("Step 2: Collecting Itch games...")
-        try:
-            itch_result = collect_itch_task.apply()
-            results["steps"]["itch"] = {
-                "status": "success",
-                "result": itch_result.get() if itch_result else None
-            }
-            logger.info(f"✅ Itch collection: {results['steps']['itch']}")
-        except Exception as e:
-            logger.error(f"❌ Itch collection failed: {e}")
-            results["steps"]["itch"] = {"status": "error", "error": str(e)}
-        
-        # STEP 3: Collect Wishlist Ranks
-        logger.info("Step 3: Collecting wishlist ranks...")
-        try:
-            wishlist_result = collect_wishlist_ranks_task.apply()
-            results["steps"]["wishlist"] = {
-                "status": "success",
-                "result": wishlist_result.get() if wishlist_result else None
-            }
-            logger.info(f"✅ Wishlist collection: {results['steps']['wishlist']}")
-        except Exception as e:
-            logger.error(f"❌ Wishlist collection failed: {e}")
-            results["steps"]["wishlist"] = {"status": "error", "error": str(e)}
+        # STEPS 1-3: Itch собирается, пока идут Steam и wishlist
+        logger.info("Steps 1-3: Collecting Steam, Itch and wishlist ranks...")
+        with ThreadPoolExecutor(max_workers=len(COLLECTION_LANES)) as pool:
+            for lane_results in pool.map(run_collection_lane, COLLECTION_LANES):
+                results["steps"].update(lane_results)
         
         # STEP 4: Collect External Signals for Recent Games
         logger.info("Step 4: Collecting external signals for recent games...")
@@ -105,6 +88,26 @@ def daily_pipeline_task():
         return results
 
 
+def run_collection_lane(steps) -> dict:
+    """Выполнить шаги дорожки по очереди: {ключ шага: статус}"""
+    return {key: run_collection_step(label, task) for key, label, task in steps}
+
+
+def run_collection_step(label: str, task) -> dict:
+    """Выполнить задачу сбора в этом процессе и вернуть статус шага"""
+    try:
+        task_result = task.apply()
+        step = {
+            "status": "success",
+            "result": task_result.get() if task_result else None
+        }
+        logger.info(f"✅ {label}: {step}")
+    except Exception as e:
+        logger.error(f"❌ {label} failed: {e}")
+        step = {"status": "error", "error": str(e)}
+    return step
+
+
 def collect_external_signals_for_recent_games() -> dict:
     """
     Собрать YouTube/TikTok для игр добавленных за последние 7 дней
@@ -4,14 +4,25 @@ Enrich Game Data Task - Fetch descriptions and metadata
 from apps.worker.celery_app import celery_app
 from apps.db.session import get_db_session
 from apps.db.models import Game, GameSource
-from sqlalchemy import select
-import requests
+from apps.worker.collectors.http_client import HostBlockedError, http_client
+from sqlalchemy import exists, select, update
+import httpx
 import logging
-import time
+import orjson
+import re
+import html
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+from urllib.parse import urlencode
 from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
+FETCH_WORKERS = int(os.getenv("ENRICH_FETCH_WORKERS", "4"))
+
+HTML_TAG_RE = re.compile(r'''<(?=[A-Za-z/!?])(?:[^>"']|"[^"]*"|'[^']*')*>''')
+
 
 @celery_app.task(name="apps.worker.tasks.enrich_game_data.enrich_all_games")
 def enrich_all_games(limit: int = 50):
@@ -24,40 +35,52 @@ def enrich_all_games(limit: int = 50):
         db = get_db_session()
         
         try:
-            # Найти игры без описания
-            stmt = select(Game).where(
+            # Найти игры без описания. Берём только нужные для запросов
+            # колонки и сразу закрываем транзакцию: сетевая часть идёт минутами,
+            # держать на это время блокировки строк games нельзя.
+            stmt = select(Game.id, Game.source, Game.source_id, Game.title).where(
                 (Game.description == None) | (Game.description == '')
             ).limit(limit)
             
-            games = db.execute(stmt).scalars().all()
+            games = db.execute(stmt).all()
+            db.commit()
             
             logger.info(f"Found {len(games)} games without descriptions")
             
             enriched = 0
             failed = 0
             
-            for game in games:
+            # Запросы к Steam/Itch.io идут в пуле потоков вне транзакции.
+            # Запись — короткой транзакцией в конце; параллельный запуск
+            # (beat + кнопка) мог успеть раньше, поэтому обновляем только игры,
+            # у которых описания всё ещё нет. Каждая игра — в своём SAVEPOINT:
+            # ошибка откатывает только её.
+            candidates = [game for game in games if game.source in (GameSource.steam, GameSource.itch)]
+            with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+                fetched = list(pool.map(
+                    lambda game: fetch_enrichment(game.source, game.source_id, game.title), candidates
+                ))
+            
+            for game, fields in zip(candidates, fetched):
+                if not fields:
+                    failed += 1
+                    continue
+                
                 try:
-                    if game.source == GameSource.steam:
-                        success = enrich_steam_game(game)
-                    elif game.source == GameSource.itch:
-                        success = enrich_itch_game(game)
-                    else:
-                        continue
-                    
-                    if success:
-                        enriched += 1
-                        db.commit()
-                        logger.info(f"✅ Enriched: {game.title or game.source_id}")
-                    else:
-                        failed += 1
-                    
-                    time.sleep(1)  # Rate limiting
-                    
+                    with db.begin_nested():
+                        db.execute(
+                            update(Game)
+                            .where(Game.id == game.id)
+                            .where((Game.description == None) | (Game.description == ''))
+                            .values(**fields)
+                        )
+                    enriched += 1
+                    logger.info(f"✅ Enriched: {fields.get('title') or game.title or game.source_id}")
                 except Exception as e:
                     logger.error(f"Failed to enrich {game.source_id}: {e}")
                     failed += 1
-                    continue
+            
+            db.commit()
             
             return {
                 "status": "success",
@@ -74,58 +97,73 @@ def enrich_all_games(limit: int = 50):
         return {"status": "error", "error": str(e)}
 
 
-def enrich_steam_game(game: Game) -> bool:
+def fetch_enrichment(source, source_id: str, title: str) -> Optional[Dict]:
+    """Сетевая часть обогащения одной игры: поля для обновления или None"""
+    try:
+        if source == GameSource.steam:
+            fields = fetch_steam_enrichment(source_id)
+        else:
+            fields = fetch_itch_enrichment(source_id, title)
+    except Exception as e:
+        logger.error(f"Failed to enrich {source_id}: {e}")
+        return None
+    # Частоту запросов к Steam/Itch держит http_client (лимит на хост)
+    return fields
+
+
+def fetch_steam_enrichment(appid: str) -> Optional[Dict]:
     """Получить данные из Steam Store API"""
     try:
-        appid = game.source_id
-        
-        # Steam Store API
-        url = f"https://store.steampowered.com/api/appdetails"
-        params = {"appids": appid, "l": "english"}
+        # Steam Store API (через общий клиент: повторные запуски получают 304)
+        url = f"https://store.steampowered.com/api/appdetails?appids={appid}&l=english"
         
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        response = http_client.get(url)
+        data = orjson.loads(response.content)
         
         if str(appid) not in data or not data[str(appid)].get("success"):
-            return False
+            return None
         
         game_data = data[str(appid)]["data"]
         
         # Обновляем данные
-        game.title = game_data.get("name") or game.title
-        game.description = game_data.get("short_description") or game_data.get("about_the_game")
+        fields = {"description": game_data.get("short_description") or game_data.get("about_the_game")}
+        if game_data.get("name"):
+            fields["title"] = game_data["name"]
         
         # Обрезаем HTML теги из описания
-        if game.description:
-            soup = BeautifulSoup(game.description, 'html.parser')
-            game.description = soup.get_text()[:1000]  # Первые 1000 символов
+        if fields["description"]:
+            fields["description"] = strip_html(fields["description"])[:1000]  # Первые 1000 символов
         
-        return True
+        return fields
         
     except Exception as e:
-        logger.warning(f"Failed to enrich Steam game {game.source_id}: {e}")
-        return False
+        logger.warning(f"Failed to enrich Steam game {appid}: {e}")
+        return None
+
+
+def strip_html(markup: str) -> str:
+    """
+    Текст из HTML описания Steam без построения DOM: описания appdetails —
+    плоская разметка (p/br/img/h2), её достаточно снять регэкспом
+    """
+    return html.unescape(HTML_TAG_RE.sub('', markup))
 
 
-def enrich_itch_game(game: Game) -> bool:
+def fetch_itch_enrichment(game_id: str, title: Optional[str]) -> Dict:
     """Получить данные из Itch.io через поиск"""
+    title = title or game_id
     try:
-        game_id = game.source_id
-        title = game.title or game_id
-        
         # Itch.io search API (неофициальный)
         search_url = f"https://itch.io/search"
         params = {"q": title}
         
-        response = requests.get(search_url, params=params, timeout=10, headers={
-            'User-Agent': 'Mozilla/5.0'
-        })
-        
-        if response.status_code != 200:
+        try:
+            response = http_client.get(f"{search_url}?{urlencode(params)}", headers={
+                'User-Agent': 'Mozilla/5.0'
+            })
+        except httpx.HTTPStatusError:
             # Fallback: ставим базовое описание из названия
-            game.description = f"{title} - инди игра с Itch.io. Исследуйте уникальный геймплей и нарратив."
-            return True
+            return {"description": f"{title} - инди игра с Itch.io. Исследуйте уникальный геймплей и нарратив."}
         
         # Парсим HTML
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -140,18 +178,18 @@ def enrich_itch_game(game: Game) -> bool:
             desc_elem = first_game.find('div', class_='game_text')
             if desc_elem:
                 description = desc_elem.get_text(strip=True)
-                game.description = description[:1000]  # Первые 1000 символов
-                return True
+                return {"description": description[:1000]}  # Первые 1000 символов
         
         # Если не нашли - генерируем из названия
-        game.description = f"{title} - инди игра с Itch.io с уникальным подходом к геймплею."
-        return True
+        return {"description": f"{title} - инди игра с Itch.io с уникальным подходом к геймплею."}
         
+    except HostBlockedError:
+        # Блок хоста временный: ничего не пишем, игру возьмёт следующий прогон
+        raise
     except Exception as e:
-        logger.warning(f"Failed to enrich Itch game {game.source_id}: {e}")
+        logger.warning(f"Failed to enrich Itch game {game_id}: {e}")
         # Ставим хоть что-то
-        game.description = f"{game.title or game.source_id} - инди игра с Itch.io"
-        return True
+        return {"description": f"{title} - инди игра с Itch.io"}
 
 
 @celery_app.task(name="apps.worker.tasks.enrich_game_data.re_analyze_enriched")
@@ -168,10 +206,10 @@ def re_analyze_enriched():
         db = get_db_session()
         
         try:
-            # Найти игры с описанием и анализом
+            # Найти игры с описанием и анализом (EXISTS: каждая игра один раз)
             stmt = (
                 select(Game)
-                .join(NarrativeAnalysis, Game.id == NarrativeAnalysis.game_id)
+                .where(exists().where(NarrativeAnalysis.game_id == Game.id))
                 .where(Game.description != None)
                 .where(Game.description != '')
                 .limit(50)
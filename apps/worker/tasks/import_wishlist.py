@@ -8,11 +8,35 @@ from apps.db.models_narrative import WishlistData, WishlistMode
 from sqlalchemy import select
 import csv
 import logging
-from datetime import datetime
+import os
+from datetime import datetime, timedelta
+from itertools import islice
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Строк CSV на один запрос поиска игр
+IMPORT_BATCH_SIZE = int(os.getenv("WISHLIST_IMPORT_BATCH_SIZE", "1000"))
+
+
+def row_game_id(row: dict, source: str):
+    """ID игры в источнике из строки CSV (колонки у Steam и Itch.io разные)"""
+    if source == "steam":
+        return row.get("appid") or row.get("app_id")
+    return row.get("game_id") or row.get("id")
+
+
+def load_games_by_source_id(db, source: str, rows: list) -> dict:
+    """Игры для пачки строк CSV одним IN-запросом: source_id -> Game"""
+    source_ids = {str(game_id) for game_id in (row_game_id(row, source) for row in rows) if game_id}
+    if not source_ids:
+        return {}
+    stmt = select(Game).where(
+        Game.source == GameSource[source],
+        Game.source_id.in_(source_ids)
+    )
+    return {game.source_id: game for game in db.execute(stmt).scalars()}
+
 
 @celery_app.task(name="apps.worker.tasks.import_wishlist.import_wishlist_csv")
 def import_wishlist_csv(csv_filepath: str, source: str = "steam"):
@@ -44,79 +68,77 @@ def import_wishlist_csv(csv_filepath: str, source: str = "steam"):
             if not csv_path.exists():
                 raise FileNotFoundError(f"CSV file not found: {csv_filepath}")
             
+            # Один момент импорта на весь файл: дата по умолчанию и verified_at
+            imported_at = datetime.utcnow()
+            
             with open(csv_path, 'r', encoding='utf-8') as f:
                 reader = csv.DictReader(f)
                 
-                for row in reader:
-                    try:
-                        if source == "steam":
-                            game_id = row.get("appid") or row.get("app_id")
-                            wishlist_count = int(row.get("wishlist_count") or row.get("wishlists") or 0)
-                            date_str = row.get("date") or datetime.utcnow().isoformat()
-                        else:  # itch
-                            game_id = row.get("game_id") or row.get("id")
-                            wishlist_count = int(row.get("wishlist_count") or row.get("wishlists") or 0)
-                            date_str = row.get("date") or datetime.utcnow().isoformat()
-                        
-                        if not game_id:
-                            results["skipped"] += 1
-                            continue
-                        
-                        # Найти игру в базе
-                        stmt = select(Game).where(
-                            Game.source == GameSource[source],
-                            Game.source_id == str(game_id)
-                        )
-                        game = db.execute(stmt).scalar_one_or_none()
-                        
-                        if not game:
-                            logger.warning(f"Game not found: {source} {game_id}")
-                            results["skipped"] += 1
-                            continue
-                        
-                        # Парсим дату
+                # Игры ищутся одним запросом на пачку строк, а не по запросу на строку
+                for chunk in iter(lambda: list(islice(reader, IMPORT_BATCH_SIZE)), []):
+                    games = load_games_by_source_id(db, source, chunk)
+                    
+                    for row in chunk:
                         try:
-                            import_date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                        except:
-                            import_date = datetime.utcnow()
-                        
-                        # Проверяем существующую запись
-                        stmt = select(WishlistData).where(
-                            WishlistData.game_id == game.id,
-                            WishlistData.date >= import_date.replace(hour=0, minute=0, second=0),
-                            WishlistData.date < import_date.replace(hour=23, minute=59, second=59)
-                        )
-                        existing = db.execute(stmt).scalar_one_or_none()
-                        
-                        if existing:
-                            # Обновляем
-                            existing.wishlist_count = wishlist_count
-                            existing.mode = WishlistMode.verified
-                            existing.confidence = "high"
-                            existing.verified_source = "csv_import"
-                            existing.verified_at = datetime.utcnow()
-                            results["updated"] += 1
-                        else:
-                            # Создаём новую запись
-                            wishlist_data = WishlistData(
-                                game_id=game.id,
-                                date=import_date,
-                                mode=WishlistMode.verified,
-                                confidence="high",
-                                wishlist_count=wishlist_count,
-                                verified_source="csv_import",
-                                verified_at=datetime.utcnow(),
-                                estimation_metadata={"imported_from": csv_filepath}
+                            game_id = row_game_id(row, source)
+                            wishlist_count = int(row.get("wishlist_count") or row.get("wishlists") or 0)
+                            date_str = row.get("date")
+                            
+                            if not game_id:
+                                results["skipped"] += 1
+                                continue
+                            
+                            game = games.get(str(game_id))
+                            
+                            if not game:
+                                logger.warning(f"Game not found: {source} {game_id}")
+                                results["skipped"] += 1
+                                continue
+                            
+                            # Парсим дату
+                            try:
+                                import_date = datetime.fromisoformat(date_str.replace('Z', '+00:00')) if date_str else imported_at
+                            except:
+                                import_date = imported_at
+                            
+                            # Проверяем существующую запись за тот же день (полуоткрытый диапазон)
+                            day_start = import_date.replace(hour=0, minute=0, second=0, microsecond=0)
+                            stmt = select(WishlistData).where(
+                                WishlistData.game_id == game.id,
+                                WishlistData.date >= day_start,
+                                WishlistData.date < day_start + timedelta(days=1)
                             )
-                            db.add(wishlist_data)
-                            results["imported"] += 1
-                        
-                        logger.info(f"  ✅ {game.title}: {wishlist_count:,} wishlists")
-                        
-                    except Exception as e:
-                        logger.error(f"Failed to import row: {row}, error: {e}")
-                        results["errors"] += 1
-                        continue
+                            existing = db.execute(stmt).scalar_one_or_none()
+                            
+                            if existing:
+                                # Обновляем
+                                existing.wishlist_count = wishlist_count
+                                existing.mode = WishlistMode.verified
+                                existing.confidence = "high"
+                                existing.verified_source = "csv_import"
+                                existing.verified_at = imported_at
+                                results["updated"] += 1
+                            else:
+                                # Создаём новую запись
+                                wishlist_data = WishlistData(
+                                    game_id=game.id,
+                                    date=import_date,
+                                    mode=WishlistMode.verified,
+                                    confidence="high",
+                                    wishlist_count=wishlist_count,
+                                    verified_source="csv_import",
+                                    verified_at=imported_at,
+                                    estimation_metadata={"imported_from": csv_filepath}
+                                )
+                                db.add(wishlist_data)
+                                results["imported"] += 1
+                            
+                            logger.info(f"  ✅ {game.title}: {wishlist_count:,} wishlists")
+                            
+                        except Exception as e:
+                            logger.error(f"Failed to import row: {row}, error: {e}")
+                            results["errors"] += 1
+                            continue
             
             db.commit()
             
@@ -1,6 +1,7 @@
 from apps.worker.celery_app import celery_app
 from apps.db.session import get_db_session
 from apps.db.models_investor import PipelineRun
+from sqlalchemy import exists
 from datetime import datetime
 import logging
 
@@ -96,7 +97,10 @@ def collect_wishlist_stage(run_id, params, db):
 def narrative_analysis_stage(run_id, params, db):
     from apps.db.models import Game
     from apps.db.models_investor import GameNarrativeAnalysis
-    games = db.query(Game).filter(~Game.id.in_(db.query(GameNarrativeAnalysis.game_id))).limit(50).all()
+    # NOT EXISTS вместо NOT IN: планировщик строит hash anti-join
+    games = db.query(Game).filter(
+        ~exists().where(GameNarrativeAnalysis.game_id == Game.id)
+    ).limit(50).all()
     for game in games:
         narrative = GameNarrativeAnalysis(game_id=game.id, primary_level='biological', primary_pattern='survival', pattern_in_gameplay=True, confidence=0.7)
         db.add(narrative)
@@ -107,7 +111,9 @@ def investment_scoring_stage(run_id, params, db):
     from apps.db.models import Game
     from apps.db.models_investor import GameInvestmentScore
     from apps.worker.tasks.score_game_investment import score_game_investment_task
-    games = db.query(Game).filter(~Game.id.in_(db.query(GameInvestmentScore.game_id))).limit(50).all()
+    games = db.query(Game).filter(
+        ~exists().where(GameInvestmentScore.game_id == Game.id)
+    ).limit(50).all()
     for game in games:
         try:
             score_game_investment_task(str(game.id))
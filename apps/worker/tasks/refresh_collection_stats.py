@@ -0,0 +1,64 @@
+"""
+ЛОГИКА: Свёртка истории сборов по источникам
+
+/analytics/collection-stats читает готовую строку из mv_collection_stats
+вместо агрегации всей trend_collection_history на каждый запрос.
+"""
+
+from apps.worker.celery_app import celery_app
+from apps.db.session import get_db_session
+from sqlalchemy import text
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Свёртка устарела, если с прошлой пересборки появились новые сборы
+# или какой-то из них завершился (running -> completed/failed).
+# Оба счётчика истории берутся за один проход по таблице.
+STATS_STALE_SQL = text("""
+    SELECT (h.total_runs, h.finished_runs) IS DISTINCT FROM (mv.total_runs, mv.finished_runs)
+    FROM (
+        SELECT
+            COUNT(*) as total_runs,
+            COUNT(*) FILTER (WHERE status IN ('completed', 'failed')) as finished_runs
+        FROM trend_collection_history
+    ) h, (
+        SELECT
+            COALESCE(SUM(total_runs), 0) as total_runs,
+            COALESCE(SUM(successful_runs + failed_runs), 0) as finished_runs
+        FROM mv_collection_stats
+    ) mv
+""")
+
+# Время последней проверки: свёртка актуальна на этот момент, даже если
+# пересборку пропустили (refreshed_at в самой MV — время последней пересборки)
+MARK_CHECKED_SQL = text("""
+    INSERT INTO collection_stats_meta (id, checked_at)
+    VALUES (true, now())
+    ON CONFLICT (id) DO UPDATE SET checked_at = EXCLUDED.checked_at
+""")
+
+
+@celery_app.task(name="apps.worker.tasks.refresh_collection_stats.refresh_collection_stats_task")
+def refresh_collection_stats_task():
+    """Пересобрать mv_collection_stats"""
+    db = get_db_session()
+    try:
+        # Сборы идут несколько раз в день, beat — каждые 5 минут: чаще всего пересобирать нечего
+        if not db.execute(STATS_STALE_SQL).scalar():
+            db.execute(MARK_CHECKED_SQL)
+            db.commit()
+            return {"status": "skipped", "reason": "no new collection runs"}
+        
+        # CONCURRENTLY: читатели не блокируются на время пересборки
+        db.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_collection_stats"))
+        db.execute(MARK_CHECKED_SQL)
+        db.commit()
+        return {"status": "success"}
+        
+    except Exception as e:
+        logger.error(f"Collection stats refresh error: {e}", exc_info=True)
+        db.rollback()
+        return {"status": "error", "error": str(e)}
+    finally:
+        db.close()
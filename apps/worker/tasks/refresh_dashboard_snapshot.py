@@ -0,0 +1,50 @@
+"""
+ЛОГИКА: Предрасчёт /analytics/dashboard
+
+Весь ответ dashboard детерминирован по текущим данным, поэтому beat
+раз в 30 секунд пишет его в dashboard_snapshot, а endpoint читает
+одну jsonb-строку вместо агрегатов по нескольким таблицам.
+"""
+
+from apps.worker.celery_app import celery_app
+from apps.db.session import get_db_session
+from apps.api.dashboard_stats import compute_dashboard_stats
+from sqlalchemy import text
+import logging
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Старые снимки не нужны: endpoint читает только последний
+SNAPSHOT_RETENTION_SECONDS = 300
+
+INSERT_SNAPSHOT_SQL = text("""
+    INSERT INTO dashboard_snapshot (payload)
+    VALUES (CAST(:payload AS jsonb))
+""")
+
+PRUNE_SNAPSHOTS_SQL = text("""
+    DELETE FROM dashboard_snapshot
+    WHERE captured_at < now() - make_interval(secs => :retention)
+""")
+
+
+@celery_app.task(name="apps.worker.tasks.refresh_dashboard_snapshot.refresh_dashboard_snapshot_task")
+def refresh_dashboard_snapshot_task():
+    """Записать свежий снимок dashboard и удалить устаревшие"""
+    db = get_db_session()
+    try:
+        payload = compute_dashboard_stats(db)
+        
+        db.execute(INSERT_SNAPSHOT_SQL, {'payload': orjson.dumps(payload).decode()})
+        db.execute(PRUNE_SNAPSHOTS_SQL, {'retention': SNAPSHOT_RETENTION_SECONDS})
+        db.commit()
+        
+        return {"status": "success"}
+        
+    except Exception as e:
+        logger.error(f"Dashboard snapshot error: {e}", exc_info=True)
+        db.rollback()
+        return {"status": "error", "error": str(e)}
+    finally:
+        db.close()
@@ -8,9 +8,11 @@ Steam — валидация и масштабирование
 
 from apps.worker.celery_app import celery_app
 from apps.db.session import get_db_session
+from apps.api.investor_overview import build_investor_overview
 from sqlalchemy import text
-from datetime import date
+from datetime import date, timedelta
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 
@@ -21,71 +23,74 @@ def save_daily_snapshot_task():
     try:
         today = date.today()
         
-        # Получить топ механики из YouTube
-        youtube_data = db.execute(text("""
-            SELECT 
-                unnest(top_mechanics) as mechanic,
-                COUNT(*) as mentions,
-                AVG(confidence) as avg_confidence
-            FROM youtube_trend_snapshots
-            WHERE date = :today
-            GROUP BY mechanic
-            ORDER BY mentions DESC
-            LIMIT 10
-        """), {'today': today}).fetchall()
+        # Топ механики из YouTube — агрегация и upsert одним запросом
+        youtube_count = db.execute(text("""
+            INSERT INTO trend_daily_snapshot 
+            (date, source, trend_name, trend_type, trend_score, confidence, video_count, keywords)
+            SELECT
+                :today, 'youtube', mechanic, 'механика',
+                (mentions * 10)::int,
+                COALESCE(NULLIF(avg_confidence, 0), 0.5),
+                mentions,
+                '{}'
+            FROM (
+                SELECT 
+                    unnest(top_mechanics) as mechanic,
+                    COUNT(*) as mentions,
+                    AVG(confidence) as avg_confidence
+                FROM youtube_trend_snapshots
+                WHERE date = :today
+                GROUP BY mechanic
+                ORDER BY mentions DESC
+                LIMIT 10
+            ) youtube_top
+            ON CONFLICT (date, source, trend_name) DO UPDATE
+            SET trend_score = EXCLUDED.trend_score, confidence = EXCLUDED.confidence
+        """), {'today': today}).rowcount
         
-        for row in youtube_data:
-            mechanic, mentions, confidence = row
-            
-            db.execute(text("""
-                INSERT INTO trend_daily_snapshot 
-                (date, source, trend_name, trend_type, trend_score, confidence, video_count, keywords)
-                VALUES (:date, 'youtube', :name, 'механика', :score, :conf, :count, '{}')
-                ON CONFLICT (date, source, trend_name) DO UPDATE
-                SET trend_score = EXCLUDED.trend_score, confidence = EXCLUDED.confidence
-            """), {
-                'date': today,
-                'name': mechanic,
-                'score': int(mentions * 10),
-                'conf': float(confidence) if confidence else 0.5,
-                'count': int(mentions)
-            })
+        # Топ темы из Reddit — так же одним запросом
+        reddit_count = db.execute(text("""
+            INSERT INTO trend_daily_snapshot 
+            (date, source, trend_name, trend_type, trend_score, confidence, post_count, comment_count, keywords)
+            SELECT
+                :today, 'reddit', query, 'тема',
+                COALESCE(total_score, 0),
+                CASE WHEN post_count > 5 THEN 0.7 ELSE 0.5 END,
+                post_count,
+                COALESCE(total_comments, 0),
+                '{}'
+            FROM (
+                SELECT 
+                    query,
+                    COUNT(*) as post_count,
+                    SUM(score) as total_score,
+                    SUM(num_comments) as total_comments
+                FROM reddit_trend_posts
+                WHERE collected_at >= :today AND collected_at < :tomorrow
+                GROUP BY query
+                ORDER BY total_score DESC
+                LIMIT 10
+            ) reddit_top
+            ON CONFLICT (date, source, trend_name) DO UPDATE
+            SET trend_score = EXCLUDED.trend_score, post_count = EXCLUDED.post_count
+        """), {'today': today, 'tomorrow': today + timedelta(days=1)}).rowcount
         
-        # Получить топ темы из Reddit
-        reddit_data = db.execute(text("""
-            SELECT 
-                query,
-                COUNT(*) as post_count,
-                SUM(score) as total_score,
-                SUM(num_comments) as total_comments
-            FROM reddit_trend_posts
-            WHERE collected_at::date = :today
-            GROUP BY query
-            ORDER BY total_score DESC
-            LIMIT 10
-        """), {'today': today}).fetchall()
-        
-        for row in reddit_data:
-            query, post_count, total_score, total_comments = row
-            
-            db.execute(text("""
-                INSERT INTO trend_daily_snapshot 
-                (date, source, trend_name, trend_type, trend_score, confidence, post_count, comment_count, keywords)
-                VALUES (:date, 'reddit', :name, 'тема', :score, :conf, :posts, :comments, '{}')
-                ON CONFLICT (date, source, trend_name) DO UPDATE
-                SET trend_score = EXCLUDED.trend_score, post_count = EXCLUDED.post_count
-            """), {
-                'date': today,
-                'name': query,
-                'score': int(total_score or 0),
-                'conf': 0.7 if post_count > 5 else 0.5,
-                'posts': int(post_count),
-                'comments': int(total_comments or 0)
-            })
+        # Инвесторский обзор считается из только что записанного снимка,
+        # чтобы /analytics/investor-overview отдавал готовый jsonb
+        overview = build_investor_overview(db, today)
+        db.execute(text("""
+            INSERT INTO investor_overview_cache (date, payload)
+            VALUES (:date, CAST(:payload AS jsonb))
+            ON CONFLICT (date) DO UPDATE
+            SET payload = EXCLUDED.payload, updated_at = now()
+        """), {
+            'date': today,
+            'payload': orjson.dumps(overview, default=float).decode()
+        })
         
         db.commit()
-        logger.info(f"✅ Сохранён дневной snapshot: {len(youtube_data)} YouTube + {len(reddit_data)} Reddit")
-        return {"status": "success", "youtube": len(youtube_data), "reddit": len(reddit_data)}
+        logger.info(f"✅ Сохранён дневной snapshot: {youtube_count} YouTube + {reddit_count} Reddit")
+        return {"status": "success", "youtube": youtube_count, "reddit": reddit_count}
         
     except Exception as e:
         logger.error(f"Snapshot save error: {e}", exc_info=True)
@@ -0,0 +1,33 @@
+"""mv_latest_game_metrics
+
+Revision ID: 002
+Revises: 40f382a72f21
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '40f382a72f21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Latest game_metrics_daily row per game; refreshed by update_all_metrics_task
+    op.execute("""
+        CREATE MATERIALIZED VIEW mv_latest_game_metrics AS
+        SELECT DISTINCT ON (game_id)
+            game_id, date, reviews_total, followers, wishlists,
+            reviews_7d, reviews_30d, review_velocity_7d, momentum_ratio
+        FROM game_metrics_daily
+        ORDER BY game_id, date DESC
+    """)
+    # Unique index is required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute("CREATE UNIQUE INDEX ix_mv_latest_game_metrics_game_id ON mv_latest_game_metrics (game_id)")
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_latest_game_metrics")
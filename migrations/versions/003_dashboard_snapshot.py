@@ -0,0 +1,33 @@
+"""dashboard_snapshot
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Precomputed /analytics/dashboard payloads, written by refresh_dashboard_snapshot_task
+    op.create_table('dashboard_snapshot',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('captured_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_dashboard_snapshot_captured_at', 'dashboard_snapshot', ['captured_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_dashboard_snapshot_captured_at', table_name='dashboard_snapshot')
+    op.drop_table('dashboard_snapshot')
@@ -0,0 +1,31 @@
+"""investor_overview_cache
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Ready-to-serve /analytics/investor-overview payload, one row per day
+    op.create_table('investor_overview_cache',
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('date')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('investor_overview_cache')
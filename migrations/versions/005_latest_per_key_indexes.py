@@ -0,0 +1,36 @@
+"""latest_per_key_indexes
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction; don't lock live tables
+    with op.get_context().autocommit_block():
+        # /analytics/trend-timeline: WHERE trend_name = ... ORDER BY week_start DESC
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_trend_weekly_aggregate_name_week
+            ON trend_weekly_aggregate (trend_name, week_start DESC)
+        """)
+        # /analytics/collection-history: WHERE source = ... ORDER BY started_at DESC
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_trend_collection_history_source_started
+            ON trend_collection_history (source, started_at DESC)
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_trend_collection_history_source_started")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_trend_weekly_aggregate_name_week")
@@ -0,0 +1,33 @@
+"""created_at_range_indexes
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Day filters are half-open ranges on the raw column now; give them an index
+    with op.get_context().autocommit_block():
+        # Dropped in 40f382a72f21; used by /games date filters and compute_trends
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_games_created_at ON games (created_at)")
+        # save_daily_snapshot: today's Reddit posts
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reddit_trend_posts_collected_at
+            ON reddit_trend_posts (collected_at)
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_reddit_trend_posts_collected_at")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_games_created_at")
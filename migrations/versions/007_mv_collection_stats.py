@@ -0,0 +1,38 @@
+"""mv_collection_stats
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Per-source rollup of trend_collection_history; refreshed by refresh_collection_stats_task
+    op.execute("""
+        CREATE MATERIALIZED VIEW mv_collection_stats AS
+        SELECT 
+            source,
+            COUNT(*) as total_runs,
+            SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as successful_runs,
+            SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END) as failed_runs,
+            SUM(items_collected) as total_items,
+            MAX(started_at) as last_run,
+            AVG(EXTRACT(EPOCH FROM (completed_at - started_at))) as avg_duration
+        FROM trend_collection_history
+        GROUP BY source
+    """)
+    # Unique index is required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute("CREATE UNIQUE INDEX ix_mv_collection_stats_source ON mv_collection_stats (source)")
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_collection_stats")
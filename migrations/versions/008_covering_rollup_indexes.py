@@ -0,0 +1,44 @@
+"""covering_rollup_indexes
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 15:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Range scans that feed GROUP BY read only the index (index-only scan)
+    with op.get_context().autocommit_block():
+        # /analytics/weekly-trends: weeks since :start_date grouped by trend_name
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_trend_weekly_aggregate_week_start_covering
+            ON trend_weekly_aggregate (week_start)
+            INCLUDE (trend_name, avg_score, growth_rate, stability_index, total_mentions)
+        """)
+        # save_daily_snapshot: today's Reddit posts grouped by query;
+        # supersedes the plain collected_at index from 006
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reddit_trend_posts_collected_at_covering
+            ON reddit_trend_posts (collected_at)
+            INCLUDE (query, score, num_comments)
+        """)
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_reddit_trend_posts_collected_at")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_reddit_trend_posts_collected_at
+            ON reddit_trend_posts (collected_at)
+        """)
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_reddit_trend_posts_collected_at_covering")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_trend_weekly_aggregate_week_start_covering")
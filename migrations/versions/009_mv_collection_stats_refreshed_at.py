@@ -0,0 +1,46 @@
+"""mv_collection_stats_refreshed_at
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+COLLECTION_STATS_SELECT = """
+    SELECT 
+        source,
+        COUNT(*) as total_runs,
+        SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as successful_runs,
+        SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END) as failed_runs,
+        SUM(items_collected) as total_items,
+        MAX(started_at) as last_run,
+        AVG(EXTRACT(EPOCH FROM (completed_at - started_at))) as avg_duration{extra}
+    FROM trend_collection_history
+    GROUP BY source
+"""
+
+
+def recreate_view(extra: str) -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_collection_stats")
+    op.execute("CREATE MATERIALIZED VIEW mv_collection_stats AS" + COLLECTION_STATS_SELECT.format(extra=extra))
+    op.execute("CREATE UNIQUE INDEX ix_mv_collection_stats_source ON mv_collection_stats (source)")
+
+
+def upgrade() -> None:
+    # now() is evaluated at REFRESH time: when the rollup last picked up new runs.
+    # Unchanged refreshes are skipped, so the last check time lives in
+    # collection_stats_meta (012); /collection-stats reports that one.
+    recreate_view(",\n        now() as refreshed_at")
+
+
+def downgrade() -> None:
+    recreate_view("")
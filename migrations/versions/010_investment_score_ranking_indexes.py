@@ -0,0 +1,35 @@
+"""investment_score_ranking_indexes
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17 16:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # /analytics/games/enriched: ORDER BY gap_score DESC LIMIT, optionally
+    # filtered by investor_category — the index delivers rows pre-sorted
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_game_investment_scores_gap_score
+            ON game_investment_scores (gap_score DESC)
+        """)
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_game_investment_scores_category_gap_score
+            ON game_investment_scores (investor_category, gap_score DESC)
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_game_investment_scores_category_gap_score")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_game_investment_scores_gap_score")
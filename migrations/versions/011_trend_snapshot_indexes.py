@@ -0,0 +1,42 @@
+"""trend_snapshot_indexes
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17 19:10:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # /analytics/trend-snapshots: ORDER BY created_at DESC LIMIT 5
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_youtube_trend_snapshots_created_at
+            ON youtube_trend_snapshots (created_at DESC)
+        """)
+        # /analytics/reddit-insights: последний reddit_* снимок, не проходя YouTube-снимки
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_youtube_trend_snapshots_reddit_created_at
+            ON youtube_trend_snapshots (created_at DESC)
+            WHERE query_set LIKE 'reddit_%'
+        """)
+        # save_daily_snapshot: агрегация механик за день (WHERE date = :today)
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_youtube_trend_snapshots_date
+            ON youtube_trend_snapshots (date)
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_youtube_trend_snapshots_date")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_youtube_trend_snapshots_reddit_created_at")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_youtube_trend_snapshots_created_at")
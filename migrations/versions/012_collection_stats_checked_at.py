@@ -0,0 +1,31 @@
+"""collection_stats_checked_at
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Single row: when refresh_collection_stats_task last confirmed that
+    # mv_collection_stats is current (refreshed or found unchanged)
+    op.create_table('collection_stats_meta',
+        sa.Column('id', sa.Boolean(), server_default=sa.text('true'), nullable=False),
+        sa.Column('checked_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.CheckConstraint('id', name='ck_collection_stats_meta_single_row')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('collection_stats_meta')
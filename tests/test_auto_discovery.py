@@ -0,0 +1,56 @@
+import uuid
+from types import SimpleNamespace
+
+from apps.worker.tasks import analyze_narrative, auto_discovery
+
+
+class KeysetSession:
+    """Evaluates the page query's bound params (after_id, limit) over a list of games"""
+
+    def __init__(self, games):
+        self.games = sorted(games, key=lambda game: game.id)
+        self.statements = []
+
+    def execute(self, stmt):
+        self.statements.append(str(stmt))
+        params = stmt.compile().params.values()
+        after_id = next((v for v in params if isinstance(v, str)), None)
+        limit = next(v for v in params if isinstance(v, int))
+        page = [g for g in self.games if after_id is None or g.id > after_id][:limit]
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: page))
+
+    def close(self):
+        pass
+
+
+def test_analyze_new_games_continues_after_failed_page(monkeypatch):
+    """Second page starts after the first page's last id, even when every analysis failed"""
+    games = [
+        SimpleNamespace(id=str(uuid.uuid4()), title=f"Game {i}", source_id=str(i))
+        for i in range(5)
+    ]
+    session = KeysetSession(games)
+    analyzed_ids = []
+    chained = []
+
+    def failing_analysis(game_id):
+        analyzed_ids.append(game_id)
+        return {"status": "error", "error": "llm down"}
+
+    monkeypatch.setattr(auto_discovery, "get_db_session", lambda: session)
+    monkeypatch.setattr(analyze_narrative, "analyze_game_narrative", failing_analysis)
+    monkeypatch.setattr(auto_discovery.analyze_new_games, "apply_async", lambda kwargs: chained.append(kwargs))
+
+    first = auto_discovery.analyze_new_games(page_size=3)
+    assert first["failed"] == 3
+    assert first["next_after_id"] == session.games[2].id
+    assert chained == [{"page_size": 3, "after_id": session.games[2].id}]
+    assert "ORDER BY games.id" in session.statements[0]
+
+    second = auto_discovery.analyze_new_games(**chained[0])
+    second_ids = analyzed_ids[3:]
+    assert second_ids == [g.id for g in session.games[3:]]
+    assert not set(second_ids) & set(analyzed_ids[:3])
+    # Short page: the walk is over, nothing more is queued
+    assert second["next_after_id"] is None
+    assert len(chained) == 1
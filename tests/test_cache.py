@@ -0,0 +1,93 @@
+import pytest
+import redis
+from types import SimpleNamespace
+
+from apps.api import cache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.gets = 0
+
+    def get(self, key):
+        self.gets += 1
+        return self.store.get(key)
+
+    def set(self, key, value, ex=None):
+        self.store[key] = value
+
+
+class BrokenRedis:
+    def get(self, key):
+        raise redis.ConnectionError("down")
+
+    def set(self, key, value, ex=None):
+        raise redis.ConnectionError("down")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock for the in-process layer"""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=lambda: now.value))
+    monkeypatch.setattr(cache, "_local_cache", cache.OrderedDict())
+    return now
+
+
+def test_local_entry_expires_after_ttl(clock):
+    """Local entry is served until its TTL runs out, then dropped"""
+    cache._local_set("k", {"v": 1}, 5)
+    clock.value += 4.9
+    assert cache._local_get("k") == {"v": 1}
+    clock.value += 0.1
+    assert cache._local_get("k") is None
+    assert "k" not in cache._local_cache
+
+
+def test_local_cache_evicts_least_recently_set(clock, monkeypatch):
+    """Over LOCAL_CACHE_SIZE the oldest key goes first"""
+    monkeypatch.setattr(cache, "LOCAL_CACHE_SIZE", 2)
+    cache._local_set("a", 1, 5)
+    cache._local_set("b", 2, 5)
+    cache._local_set("a", 3, 5)  # re-set moves "a" to the end
+    cache._local_set("c", 4, 5)
+    assert cache._local_get("b") is None
+    assert cache._local_get("a") == 3
+    assert cache._local_get("c") == 4
+
+
+def test_non_positive_ttl_is_not_stored(clock):
+    cache._local_set("k", 1, 0)
+    assert cache._local_get("k") is None
+
+
+def test_cache_get_json_reads_redis_once_per_local_ttl(clock, monkeypatch):
+    """Redis hit is copied into memory; repeated reads within the local TTL skip Redis"""
+    fake = FakeRedis()
+    fake.store["k"] = b'{"total": 3}'
+    monkeypatch.setattr(cache, "get_redis", lambda: fake)
+
+    assert cache.cache_get_json("k") == {"total": 3}
+    assert cache.cache_get_json("k") == {"total": 3}
+    assert fake.gets == 1
+
+    clock.value += cache.LOCAL_CACHE_TTL
+    assert cache.cache_get_json("k") == {"total": 3}
+    assert fake.gets == 2
+
+
+def test_cache_set_json_caps_local_ttl_by_redis_ttl(clock, monkeypatch):
+    """A short Redis TTL is not outlived by the local copy"""
+    monkeypatch.setattr(cache, "get_redis", lambda: FakeRedis())
+    cache.cache_set_json("k", [1], ttl_seconds=1)
+    clock.value += 1
+    assert cache._local_get("k") is None
+
+
+def test_redis_errors_degrade_to_miss(clock, monkeypatch):
+    """Redis down: writes still fill memory, reads of unknown keys are a miss"""
+    monkeypatch.setattr(cache, "get_redis", lambda: BrokenRedis())
+    cache.cache_set_json("k", {"v": 1}, ttl_seconds=60)
+    assert cache.cache_get_json("k") == {"v": 1}
+    assert cache.cache_get_json("other") is None
@@ -0,0 +1,74 @@
+from apps.worker.tasks.collect_wishlist_ranks import parse_search_appids
+
+
+def search_row(appid: str) -> bytes:
+    """Search result row as Steam renders it: long attributes before class"""
+    tagids = ",".join(str(tag) for tag in range(200))
+    return (
+        f'<a href="https://store.steampowered.com/app/{appid}/" '
+        f'data-ds-tagids="[{tagids}]" data-ds-appid="{appid}" '
+        f'onmouseover="GameHover(this, event)" class="search_result_row ds_collapse_flag ">'
+        f'<span class="title">Game {appid}</span></a>'
+    ).encode()
+
+
+PAGE = (
+    b'<html><div class="home_carousel">'
+    b'<a data-ds-appid="999" class="carousel_item">ad</a></div>'
+    + search_row("10") + search_row("20") + search_row("10") + search_row("30")
+    + b'<a data-ds-bundleid="5" class="search_result_row">bundle</a>'
+    + search_row("40")
+    + b'<footer></footer></html>'
+)
+
+
+def split_at(data: bytes, *marks: bytes) -> list:
+    """Cut `data` in the middle of each marker occurrence"""
+    chunks, start = [], 0
+    for mark in marks:
+        cut = data.index(mark, start) + len(mark) // 2
+        chunks.append(data[start:cut])
+        start = cut
+    chunks.append(data[start:])
+    return chunks
+
+
+def test_rank_order_dedup_and_widgets_ignored():
+    """Rows in page order, repeated appid kept once, carousel appid skipped"""
+    assert parse_search_appids([PAGE], limit=100) == ["10", "20", "30", "40"]
+
+
+def test_chunks_split_inside_row_tag_and_appid_attribute():
+    """A tag or attribute cut by a chunk boundary is still parsed"""
+    chunks = split_at(
+        PAGE,
+        b'class="search_result_row',  # inside the first row's class attribute
+        b'data-ds-appid="20"',         # inside the second row's appid attribute
+        b'data-ds-tagids="[',          # inside the third row's long tag list
+    )
+    assert len(chunks) == 4
+    assert parse_search_appids(chunks, limit=100) == ["10", "20", "30", "40"]
+
+
+def test_byte_by_byte_chunks():
+    chunks = [PAGE[i:i + 1] for i in range(len(PAGE))]
+    assert parse_search_appids(chunks, limit=100) == ["10", "20", "30", "40"]
+
+
+def test_stops_after_limit_rows():
+    """limit counts rows (duplicates and bundles included), not unique appids"""
+    assert parse_search_appids([PAGE], limit=3) == ["10", "20"]
+    assert parse_search_appids([PAGE], limit=5) == ["10", "20", "30"]
+
+
+def test_stops_reading_chunks_at_limit():
+    """Chunks after the limit row are never pulled from the stream"""
+    pulled = []
+
+    def stream():
+        for chunk in split_at(PAGE, b'data-ds-appid="30"'):
+            pulled.append(chunk)
+            yield chunk
+
+    assert parse_search_appids(stream(), limit=2) == ["10", "20"]
+    assert len(pulled) == 1
@@ -0,0 +1,182 @@
+import httpx
+import pytest
+from types import SimpleNamespace
+
+from apps.worker.collectors import http_client as http_module
+from apps.worker.collectors.http_client import RateLimitedHTTPClient
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake wall clock: sleep() advances it and records the requested delay"""
+    now = SimpleNamespace(value=1000.0, sleeps=[])
+
+    def sleep(seconds):
+        now.sleeps.append(seconds)
+        now.value += seconds
+
+    monkeypatch.setattr(http_module, "time", SimpleNamespace(time=lambda: now.value, sleep=sleep))
+    return now
+
+
+@pytest.fixture
+def client():
+    client = RateLimitedHTTPClient()
+    client.rate_limit = 1.0
+    client.burst = 3
+    return client
+
+
+def test_bucket_allows_burst_then_waits_one_interval(clock, client):
+    """First `burst` requests go out at once, the next waits one refill interval"""
+    for _ in range(3):
+        client._wait_for_rate_limit("store.steampowered.com")
+    assert clock.sleeps == []
+
+    client._wait_for_rate_limit("store.steampowered.com")
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+
+def test_bucket_refills_with_elapsed_time(clock, client):
+    """Tokens come back at one per rate_limit seconds, capped at burst"""
+    for _ in range(3):
+        client._wait_for_rate_limit("itch.io")
+
+    clock.value += 2.0
+    client._wait_for_rate_limit("itch.io")
+    client._wait_for_rate_limit("itch.io")
+    assert clock.sleeps == []
+
+    clock.value += 100.0
+    for _ in range(3):
+        client._wait_for_rate_limit("itch.io")
+    assert clock.sleeps == []
+    client._wait_for_rate_limit("itch.io")
+    assert len(clock.sleeps) == 1
+
+
+def test_buckets_are_per_host(clock, client):
+    """Draining one host does not slow down another"""
+    for _ in range(3):
+        client._wait_for_rate_limit("store.steampowered.com")
+    client._wait_for_rate_limit("steamspy.com")
+    assert clock.sleeps == []
+
+
+def test_drained_bucket_waits_full_interval(clock, client):
+    """After a 429 the host's bucket is empty"""
+    client._drain_bucket("store.steampowered.com")
+    client._wait_for_rate_limit("store.steampowered.com")
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+
+def mock_transport(client, handler):
+    """Route the client's requests to `handler`, recording each request"""
+    seen = []
+
+    def record(request):
+        seen.append(request)
+        return handler(request)
+
+    client.client = httpx.Client(transport=httpx.MockTransport(record))
+    return seen
+
+
+def test_not_modified_reuses_cached_response(clock, client):
+    """Second GET sends the validators and a 304 returns the stored body"""
+    def handler(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=b"<p>page</p>", headers={"ETag": '"v1"', "Content-Type": "text/html; charset=utf-8"})
+
+    seen = mock_transport(client, handler)
+    url = "https://store.steampowered.com/api/appdetails?appids=1"
+
+    first = client.get(url)
+    second = client.get(url)
+
+    assert "If-None-Match" not in seen[0].headers
+    assert seen[1].headers["If-None-Match"] == '"v1"'
+    assert second is not first
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.text == "<p>page</p>"
+
+
+def test_response_without_validators_is_not_cached(clock, client):
+    """No ETag/Last-Modified: nothing to revalidate, next GET is unconditional"""
+    seen = mock_transport(client, lambda request: httpx.Response(200, content=b"page"))
+    url = "https://itch.io/search?q=game"
+
+    client.get(url)
+    client.get(url)
+
+    assert url not in client.validator_cache
+    assert "If-None-Match" not in seen[1].headers
+    assert "If-Modified-Since" not in seen[1].headers
+
+
+def test_validator_cache_is_bounded(clock, client):
+    """Oldest URLs are evicted past validator_cache_size"""
+    client.validator_cache_size = 2
+    mock_transport(client, lambda request: httpx.Response(200, headers={"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}))
+
+    for appid in range(3):
+        client.get(f"https://store.steampowered.com/app/{appid}/")
+
+    assert list(client.validator_cache) == [
+        "https://store.steampowered.com/app/1/",
+        "https://store.steampowered.com/app/2/",
+    ]
+
+
+def test_validator_cache_is_bounded_by_bytes(clock, client):
+    """Bodies past validator_cache_bytes evict the oldest pages; oversized ones are not kept"""
+    client.validator_cache_bytes = 10
+    mock_transport(client, lambda request: httpx.Response(
+        200, content=b"x" * int(request.url.params["size"]), headers={"ETag": '"v"'}
+    ))
+
+    client.get("https://itch.io/a?size=4")
+    client.get("https://itch.io/b?size=4")
+    client.get("https://itch.io/c?size=4")
+    assert list(client.validator_cache) == ["https://itch.io/b?size=4", "https://itch.io/c?size=4"]
+    assert client.validator_cache_used == 8
+
+    client.get("https://itch.io/d?size=11")
+    assert "https://itch.io/d?size=11" not in client.validator_cache
+    assert client.validator_cache_used == 8
+
+
+def test_blocked_host_waits_out_the_cooldown(clock, client):
+    """403/429 fails that call; the next call to the host sleeps until the cooldown ends"""
+    client.block_cooldown = 60.0
+    responses = iter([httpx.Response(429), httpx.Response(200, content=b"ok")])
+    seen = mock_transport(client, lambda request: next(responses))
+    url = "https://store.steampowered.com/app/1/"
+
+    with pytest.raises(http_module.HostBlockedError):
+        client.get(url)
+    assert len(seen) == 1
+
+    clock.value += 20.0
+    assert client.get(url).content == b"ok"
+    assert clock.sleeps[0] == pytest.approx(40.0)
+    assert len(seen) == 2
+
+
+def test_block_applies_to_host_not_just_url(clock, client):
+    """Other URLs on the blocked host wait too, other hosts do not"""
+    client.block_cooldown = 60.0
+    statuses = {"store.steampowered.com": iter([403, 200])}
+    mock_transport(client, lambda request: httpx.Response(
+        next(statuses[request.url.host]) if request.url.host in statuses else 200
+    ))
+
+    with pytest.raises(http_module.HostBlockedError):
+        client.get("https://store.steampowered.com/app/1/")
+    assert client.get("https://itch.io/").status_code == 200
+    assert clock.sleeps == []
+
+    assert client.get("https://store.steampowered.com/app/2/").status_code == 200
+    assert clock.sleeps[0] == pytest.approx(60.0)
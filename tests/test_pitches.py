@@ -0,0 +1,65 @@
+import asyncio
+import uuid
+from collections import namedtuple
+from datetime import datetime
+from types import SimpleNamespace
+
+from apps.api.routers.pitches import list_pitches
+
+PageRow = namedtuple("PageRow", ["Pitch", "total"])
+
+
+class FakeSession:
+    """Answers the page query, then the fallback count query"""
+
+    def __init__(self, page_rows, count=None):
+        self.results = [page_rows, count]
+        self.statements = []
+
+    def execute(self, stmt):
+        self.statements.append(stmt)
+        result = self.results[len(self.statements) - 1]
+        return SimpleNamespace(all=lambda: result, scalar=lambda: result)
+
+
+def make_pitch():
+    now = datetime(2026, 1, 1)
+    return SimpleNamespace(
+        id=uuid.uuid4(), dev_name="Dev", email="dev@test.com", studio_name=None,
+        team_size=2, released_before=False, timeline_months=12, pitch_text="x" * 20,
+        hook_one_liner=None, links={}, build_link=None, video_link=None, tags=[],
+        status="pending", created_at=now, updated_at=now, score=None, pitch_scores=None,
+    )
+
+
+def call_list_pitches(db, page, page_size=20):
+    return asyncio.run(list_pitches(
+        status=None, verdict=None, from_date=None, to_date=None,
+        page=page, page_size=page_size, db=db,
+    ))
+
+
+def test_total_comes_from_window_count_on_a_full_page():
+    """Rows carry count(*) OVER(): one query, no separate count"""
+    db = FakeSession([PageRow(make_pitch(), 41), PageRow(make_pitch(), 41)])
+    response = call_list_pitches(db, page=1)
+    assert response.total == 41
+    assert len(response.pitches) == 2
+    assert len(db.statements) == 1
+
+
+def test_total_on_empty_page_past_the_end_falls_back_to_count():
+    """Page past the last one has no row to carry the count: run the count query"""
+    db = FakeSession([], count=41)
+    response = call_list_pitches(db, page=5)
+    assert response.total == 41
+    assert response.pitches == []
+    assert len(db.statements) == 2
+
+
+def test_total_on_empty_first_page_is_zero_without_count():
+    """Empty first page means no matches at all"""
+    db = FakeSession([])
+    response = call_list_pitches(db, page=1)
+    assert response.total == 0
+    assert len(db.statements) == 1